@@ -0,0 +1,161 @@
+import sys
+from collections import OrderedDict
+
+_DEFAULT_MAX_BYTES = 64<<20
+_SIZE_SAMPLE = 32
+
+
+class CurveCache:
+    """
+    A class to represent a bounded LRU cache of values derived from one curve, such as point lists and point orders.
+
+    ...
+
+    Keys are tuples whose first entry names the kind of value, e.g. ("order",x,y), and hits and misses are counted per kind.
+    Every entry is charged its approximate size in bytes and the least recently used entries are evicted to stay
+    within maxBytes, a single value larger than maxBytes is not stored at all.
+
+    Attributes
+    ----------
+    maxBytes : int
+        the memory budget in bytes
+    bytes : int
+        the approximate size of everything currently stored
+    hits, misses, evictions, invalidations : int
+        running counts, see stats
+
+    Methods
+    -------
+    get(self, key, default):
+        Return the value stored under key, or default.
+
+    put(self, key, value, size):
+        Store value under key and evict old entries if over budget.
+
+    resize(self, maxBytes):
+        Change the memory budget.
+
+    clear(self):
+        Drop every entry, counted as an invalidation.
+
+    stats(self):
+        Return the hit, miss, eviction and size counts as a dict.
+    """
+
+    def __init__(self, maxBytes:int = _DEFAULT_MAX_BYTES):
+        """
+        Inits an empty cache with a budget of maxBytes bytes, 64 MiB by default.
+        """
+        assert isinstance(maxBytes,int) and maxBytes>=0,"maxBytes must be a non negative integer"
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._kinds = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key:tuple) -> bool:
+        return key in self._entries
+
+    def get(self, key:tuple, default=None):
+        """
+        Return the value stored under key and mark it as most recently used, or default if there is none.
+
+            Parameters:
+                    key : The key, a tuple starting with the kind of value
+                    default : Returned on a miss
+        """
+        counts = self._kinds.setdefault(key[0],[0,0])
+        entry = self._entries.get(key)
+        if (entry == None):
+            self.misses = self.misses+1
+            counts[1] = counts[1]+1
+            return default
+        self._entries.move_to_end(key)
+        self.hits = self.hits+1
+        counts[0] = counts[0]+1
+        return entry[0]
+
+    def put(self, key:tuple, value, size:int | None = None) -> bool:
+        """
+        Store value under key and return whether it was kept.
+
+            Parameters:
+                    key : The key, a tuple starting with the kind of value
+                    value : The value, it is stored as is so it should not be changed afterwards
+                    size : The size in bytes charged for the entry, estimated from the key and value by default
+        """
+        if (size == None):
+            size = _approxSize(key) + _approxSize(value)
+        old = self._entries.pop(key,None)
+        if (old != None):
+            self.bytes = self.bytes-old[1]
+        if (size > self.maxBytes):
+            return False
+        self._entries[key] = (value,size)
+        self.bytes = self.bytes+size
+        self._evict()
+        return True
+
+    def _evict(self):
+        while (self.bytes > self.maxBytes):
+            key,(value,size) = self._entries.popitem(last=False)
+            self.bytes = self.bytes-size
+            self.evictions = self.evictions+1
+
+    def resize(self, maxBytes:int):
+        """Set the memory budget to maxBytes bytes, evicting the least recently used entries if needed"""
+        assert isinstance(maxBytes,int) and maxBytes>=0,"maxBytes must be a non negative integer"
+        self.maxBytes = maxBytes
+        self._evict()
+
+    def clear(self):
+        """Drop every entry, the curve does this whenever a, b or p changes"""
+        self._entries.clear()
+        self.bytes = 0
+        self.invalidations = self.invalidations+1
+
+    def stats(self) -> dict:
+        """
+        Return the cache statistics: hits, misses, hitRate, evictions, invalidations, entries, bytes, maxBytes,\n
+        and kinds, which maps every kind of key to its own hits and misses.
+        """
+        lookups = self.hits+self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits/lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "maxBytes": self.maxBytes,
+                "kinds": {kind: {"hits": h, "misses": m} for kind,(h,m) in self._kinds.items()}}
+
+
+def _approxSize(value) -> int:
+    """
+    Return the approximate size of value in bytes, including what it refers to.\n
+    Large containers are estimated from an evenly spaced sample of 32 items, NumPy arrays by their buffer size.
+    """
+    if (hasattr(value,"nbytes")):
+        return max(sys.getsizeof(value),int(value.nbytes))
+    if (isinstance(value,dict)):
+        items = [item for i,item in zip(range(_SIZE_SAMPLE),value.items())]
+        sample = [_approxSize(k) + _approxSize(v) for (k,v) in items]
+    elif (isinstance(value,(list,tuple,set,frozenset))):
+        if (len(value) <= _SIZE_SAMPLE or isinstance(value,(set,frozenset))):
+            items = [item for i,item in zip(range(_SIZE_SAMPLE),value)]
+        else:
+            step = len(value)//_SIZE_SAMPLE
+            items = [value[i*step] for i in range(_SIZE_SAMPLE)]
+        sample = [_approxSize(item) for item in items]
+    else:
+        return sys.getsizeof(value)
+    if (len(sample) == 0):
+        return sys.getsizeof(value)
+    return sys.getsizeof(value) + (sum(sample)*len(value))//len(sample)
@@ -0,0 +1,376 @@
+import math
+import os
+import random
+import time
+from FFEllipticCurves import FiniteFieldEllipticCurve, Point, _batchInverse, _isProbablePrime
+from PointCounting import _crt, _isNonSingular
+
+_BSGS_MAX_ORDER = 1<<32
+_BSGS_MAX_TABLE = 1<<16
+_MOV_MAX_DEGREE = 20
+_RHO_PARTITION_BITS = 5
+_RHO_WALKS_PER_WORKER = 64
+_RHO_ROUND_STEPS = 1<<10
+_RHO_MAX_WALK_FACTOR = 20
+_RHO_CYCLE_WINDOW = 32
+_RHO_MAX_COLLISION_GCD = 1<<16
+
+
+def discreteLog(G:Point, Q:Point, order:int | None = None, workers:int | None = 1, progress=None, seed:int | None = None, maxSteps:int | None = None) -> int | None:
+    """
+    Return k with k*G = Q, or None if maxSteps walk steps pass without finding it.
+
+        Parameters:
+                G : The base point
+                Q : The point to find the logarithm of, on the same curve as G
+                order : The order of G, computed with pointOrder when left out
+                workers : The number of worker processes running walks, None for the number of cores
+                progress : Called with a dict of statistics after every round of walks and once more when done
+                seed : Seed for the random walk table and starting points
+                maxSteps : Give up after this many walk steps in total
+
+        Details:
+                Composite orders are split with pohligHellman.\n
+                Prime orders up to 2^32 are solved directly with baby-step giant-step.\n
+                Larger ones use Pollard rho with an r-adding walk over 32 precomputed points M_j = c_j*G + d_j*Q,\n
+                on classes {R,-R} (the negation map), which saves a factor sqrt(2) for about sqrt(pi*n/4) steps in total.\n
+                Fruitless 2-cycles of the negation map are detected and left by doubling the smaller point of the cycle.\n
+                Longer ones are found by comparing every point with one remembered every 32 steps, and left by doubling\n
+                the point with the smallest x on the cycle, so walks caught in the same cycle leave it the same way\n
+                (Bos, Kleinjung and Lenstra). Walks that still run far too long without a distinguished point are restarted.\n
+                Every walk stops at a distinguished point (some bits of x zero) and reports it, a repeated distinguished point\n
+                a1*G + b1*Q = a2*G + b2*Q gives k. Walkers share nothing but the table, so worker processes scale linearly.\n
+                The statistics passed to progress are steps, distinguished, restarts, fruitlessCycles, elapsed, stepsPerSecond,\n
+                expectedSteps, workers and done.\n
+                https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm_for_logarithms
+    """
+    order = _checkLogInput(G,Q,order)
+    if (Q.isInfinity()):
+        return 0
+    if (not _isProbablePrime(order)):
+        return pohligHellman(G,Q,order,workers,progress,seed,maxSteps)
+    return _primeOrderLog(G.curve,G.toTuple(),Q.toTuple(),order,workers,progress,seed,maxSteps)
+
+def pohligHellman(G:Point, Q:Point, order:int | None = None, workers:int | None = 1, progress=None, seed:int | None = None, maxSteps:int | None = None) -> int | None:
+    """
+    Return k with k*G = Q by solving it modulo every prime power dividing the order of G, or None if there is no such k.
+
+        Parameters:
+                G : The base point
+                Q : The point to find the logarithm of, on the same curve as G
+                order : The order of G, computed with pointOrder when left out
+                workers, progress, seed, maxSteps : Passed on to Pollard rho for prime factors above 2^32, see discreteLog
+
+        Details:
+                For each prime power l^e exactly dividing n, k mod l^e is found one base l digit at a time,\n
+                every digit being a discrete log in the subgroup of order l of (n/l)*G.\n
+                Those are solved with baby-step giant-step up to l = 2^32, with a table of at most 2^16 x coordinates,\n
+                and with Pollard rho above. The residues are joined with the Chinese remainder theorem,\n
+                so the cost is governed by the largest prime factor of n rather than by n.\n
+                https://en.wikipedia.org/wiki/Pohlig%E2%80%93Hellman_algorithm
+    """
+    import sympy.ntheory as nt
+    order = _checkLogInput(G,Q,order)
+    curve = G.curve
+    g = G.toTuple()
+    q = Q.toTuple()
+    residues = []
+    for l,e in sorted(nt.factorint(order).items()):
+        cofactor = order//(l**e)
+        x = _primePowerLog(curve,curve._pointMultiplicationUnchecked(*g,cofactor),curve._pointMultiplicationUnchecked(*q,cofactor),
+                           l,e,workers,progress,seed,maxSteps)
+        if (x == None):
+            return None
+        residues.append((x,l**e))
+    return _crt(residues)[0]
+
+def _checkLogInput(G:Point, Q:Point, order:int | None) -> int:
+    assert isinstance(G,Point) and isinstance(Q,Point),"G and Q must be Points"
+    assert G.curve is Q.curve,"points must be on the same curve"
+    assert not G.isInfinity(),"G must not be the point at infinity"
+    if (order == None):
+        order = G.curve.pointOrder(G.x,G.y)
+    assert (Q*order).isInfinity(),"Q is not in the subgroup generated by G"
+    return order
+
+def _primePowerLog(curve:FiniteFieldEllipticCurve, g:tuple[int,int], h:tuple[int,int] | tuple[None,None], l:int, e:int,
+                   workers:int | None, progress, seed:int | None, maxSteps:int | None) -> int | None:
+    gamma = curve._pointMultiplicationUnchecked(*g,l**(e-1))
+    x = 0
+    for i in range(e):
+        rx,ry = curve._pointMultiplicationUnchecked(*g,x)
+        rest = curve._pointAdditionUnchecked(*h,rx,None if ry == None else (-ry) %curve.p)
+        d = _primeOrderLog(curve,gamma,curve._pointMultiplicationUnchecked(*rest,l**(e-1-i)),l,workers,progress,seed,maxSteps)
+        if (d == None):
+            return None
+        x = x + d*l**i
+    return x
+
+def _primeOrderLog(curve:FiniteFieldEllipticCurve, g:tuple[int,int], q:tuple[int,int] | tuple[None,None], n:int,
+                   workers:int | None, progress, seed:int | None, maxSteps:int | None) -> int | None:
+    if (q == (None,None)):
+        return 0
+    if (n <= _BSGS_MAX_ORDER):
+        return _bsgsDiscreteLog(curve,g,q,n)
+    if (workers == None):
+        workers = os.cpu_count() or 1
+    return _rhoDiscreteLog(curve,g,q,n,workers,progress,seed,maxSteps)
+
+def _bsgsDiscreteLog(curve:FiniteFieldEllipticCurve, g:tuple[int,int], q:tuple[int,int] | tuple[None,None], n:int) -> int | None:
+    """
+    Return k in [0,n) with k*g = q, or None.\n
+    The baby steps j*g for 1 <= j <= m are keyed by x alone, which matches both j*g and -j*g,\n
+    so the giant stride is 2m+1 and at most _BSGS_MAX_TABLE entries are kept however large n is.
+    """
+    m = min(_BSGS_MAX_TABLE,math.isqrt(n//2)+1)
+    baby = {}
+    point = g
+    for j in range(1,m+1):
+        baby.setdefault(point[0],j)
+        point = curve._pointAdditionUnchecked(*point,*g)
+    stride = 2*m+1
+    sx,sy = curve._pointMultiplicationUnchecked(*g,stride)
+    giant = (None,None) if sx == None else (sx,(-sy) %curve.p)
+    point = q
+    for i in range(n//stride+2):
+        if (point == (None,None)):
+            return (i*stride) %n
+        j = baby.get(point[0])
+        if (j != None):
+            for k in (i*stride+j,i*stride-j):
+                if (curve._pointMultiplicationUnchecked(*g,k %n) == q):
+                    return k %n
+        point = curve._pointAdditionUnchecked(*point,*giant)
+    return None
+
+def _rhoCombination(curve:FiniteFieldEllipticCurve, g:tuple[int,int], q:tuple[int,int], c:int, d:int) -> tuple[int,int] | tuple[None,None]:
+    return curve._pointAdditionUnchecked(*curve._pointMultiplicationUnchecked(*g,c),*curve._pointMultiplicationUnchecked(*q,d))
+
+def _rhoStart(curve:FiniteFieldEllipticCurve, g:tuple[int,int], q:tuple[int,int], n:int, rng:random.Random) -> list[int]:
+    while (True):
+        c = rng.randrange(n)
+        d = rng.randrange(n)
+        x,y = _rhoCombination(curve,g,q,c,d)
+        if (x != None):
+            break
+    if (2*y > curve.p):
+        return [x,curve.p-y,(-c) %n,(-d) %n,0]
+    return [x,y,c,d,0]
+
+def _rhoWalks(a:int, b:int, p:int, n:int, g:tuple[int,int], q:tuple[int,int], table:list[tuple[int,int,int,int]],
+              states:list[list[int] | None], steps:int, dbits:int, seed:int) -> tuple[list[tuple[int,int,int]],list[list[int]],dict[str,int]]:
+    """
+    Advance every walk in states by steps steps and return the distinguished points found, the new states and counters.\n
+    All walks take their step together so a single inversion is shared between them.\n
+    Each walk remembers the x of one point per _RHO_CYCLE_WINDOW steps and the lowest point since then, meeting that x\n
+    again means the walk is in a fruitless cycle, which it leaves by doubling the lowest point of the cycle.
+    """
+    curve = FiniteFieldEllipticCurve(a,b,p)
+    rng = random.Random(seed)
+    states = [s if s != None else _rhoStart(curve,g,q,n,rng) for s in states]
+    Tx = [t[0] for t in table]
+    Ty = [t[1] for t in table]
+    Tc = [t[2] for t in table]
+    Td = [t[3] for t in table]
+    partitionMask = len(table)-1
+    distinguishedMask = ((1<<dbits)-1) << _RHO_PARTITION_BITS
+    maxLength = _RHO_MAX_WALK_FACTOR << dbits
+    half = p>>1
+    before = [None]*len(states)
+    marks = [None]*len(states)
+    lowest = [None]*len(states)
+    ages = [0]*len(states)
+    found = []
+    counters = {"restarts": 0, "fruitlessCycles": 0}
+    for step in range(steps):
+        inverses = _batchInverse([Tx[s[0] & partitionMask] - s[0] for s in states],p)
+        for i,s in enumerate(states):
+            x,y,c,d,length = s
+            j = x & partitionMask
+            inv = inverses[i]
+            if (inv == 0):
+                states[i] = _rhoStart(curve,g,q,n,rng)
+                before[i] = None
+                marks[i] = None
+                counters["restarts"] += 1
+                continue
+            lam = ((Ty[j]-y)*inv) %p
+            x3 = (lam*lam - x - Tx[j]) %p
+            y3 = (lam*(x-x3) - y) %p
+            c3 = c+Tc[j]
+            d3 = d+Td[j]
+            if (y3 > half):
+                y3 = p-y3
+                c3 = -c3
+                d3 = -d3
+            cycle = None
+            if (x3 == before[i]):
+                cycle = (x3,y3,c3,d3) if x3 < x else (x,y,c,d)
+            elif (x3 == marks[i]):
+                cycle = lowest[i]
+            elif (marks[i] == None or ages[i] >= _RHO_CYCLE_WINDOW):
+                marks[i] = x3
+                lowest[i] = (x3,y3,c3,d3)
+                ages[i] = 0
+            elif (x3 < lowest[i][0]):
+                lowest[i] = (x3,y3,c3,d3)
+            ages[i] += 1
+            if (cycle != None):
+                counters["fruitlessCycles"] += 1
+                x,y,c,d = cycle
+                marks[i] = None
+                if (y == 0):
+                    states[i] = _rhoStart(curve,g,q,n,rng)
+                    before[i] = None
+                    marks[i] = None
+                    counters["restarts"] += 1
+                    continue
+                x3,y3 = curve._pointDouble(x,y)
+                c3 = 2*c
+                d3 = 2*d
+                if (y3 > half):
+                    y3 = p-y3
+                    c3 = -c3
+                    d3 = -d3
+                before[i] = None
+            else:
+                before[i] = x
+            if (x3 & distinguishedMask == 0):
+                found.append((x3,c3 %n,d3 %n))
+                states[i] = _rhoStart(curve,g,q,n,rng)
+                before[i] = None
+                marks[i] = None
+            elif (length >= maxLength):
+                states[i] = _rhoStart(curve,g,q,n,rng)
+                before[i] = None
+                marks[i] = None
+                counters["restarts"] += 1
+            else:
+                states[i] = [x3,y3,c3 %n,d3 %n,length+1]
+    return found,states,counters
+
+def _solveCollision(curve:FiniteFieldEllipticCurve, g:tuple[int,int], q:tuple[int,int], n:int, first:tuple[int,int], second:tuple[int,int]) -> int | None:
+    c1,d1 = first
+    c2,d2 = second
+    e = math.gcd((d1-d2) %n,n)
+    if (e == n or e > _RHO_MAX_COLLISION_GCD or (c2-c1) %e != 0):
+        return None
+    m = n//e
+    k0 = (((c2-c1)//e) * pow(((d1-d2)//e) %m,-1,m)) %m
+    for t in range(e):
+        k = k0+t*m
+        if (curve._pointMultiplicationUnchecked(*g,k) == q):
+            return k
+    return None
+
+def _rhoDiscreteLog(curve:FiniteFieldEllipticCurve, g:tuple[int,int], q:tuple[int,int], n:int, workers:int, progress, seed:int | None, maxSteps:int | None) -> int | None:
+    rng = random.Random(seed)
+    table = []
+    for j in range(1<<_RHO_PARTITION_BITS):
+        while (True):
+            c = rng.randrange(n)
+            d = rng.randrange(n)
+            x,y = _rhoCombination(curve,g,q,c,d)
+            if (x != None):
+                break
+        table.append((x,y,c,d))
+    walks = workers*_RHO_WALKS_PER_WORKER
+    expected = math.sqrt(math.pi*n/4)
+    dbits = max(0,int(math.log2(max(1.0,expected/(8*walks)))))
+    distinguished = {}
+    stats = {"steps": 0, "distinguished": 0, "restarts": 0, "fruitlessCycles": 0, "elapsed": 0.0,
+             "stepsPerSecond": 0.0, "expectedSteps": expected, "workers": workers, "done": False}
+    start = time.perf_counter()
+
+    def absorb(found, counters):
+        stats["steps"] += _RHO_ROUND_STEPS*_RHO_WALKS_PER_WORKER
+        stats["restarts"] += counters["restarts"]
+        stats["fruitlessCycles"] += counters["fruitlessCycles"]
+        result = None
+        for (x,c,d) in found:
+            if (x in distinguished and result == None):
+                result = _solveCollision(curve,g,q,n,distinguished[x],(c,d))
+            distinguished[x] = (c,d)
+        stats["distinguished"] = len(distinguished)
+        stats["elapsed"] = time.perf_counter()-start
+        stats["stepsPerSecond"] = stats["steps"]/max(stats["elapsed"],1e-9)
+        stats["done"] = result != None or (maxSteps != None and stats["steps"] >= maxSteps)
+        if (progress != None):
+            progress(dict(stats))
+        return result
+
+    args = (curve.a,curve.b,curve.p,n,g,q,table)
+    if (workers == 1):
+        states = [None]*_RHO_WALKS_PER_WORKER
+        while (True):
+            found,states,counters = _rhoWalks(*args,states,_RHO_ROUND_STEPS,dbits,rng.getrandbits(64))
+            result = absorb(found,counters)
+            if (stats["done"]):
+                return result
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_rhoWalks,*args,[None]*_RHO_WALKS_PER_WORKER,_RHO_ROUND_STEPS,dbits,rng.getrandbits(64))
+                   for i in range(workers)}
+        while (True):
+            finished,pending = wait(pending,return_when=FIRST_COMPLETED)
+            for future in finished:
+                found,states,counters = future.result()
+                result = absorb(found,counters)
+                if (stats["done"]):
+                    pool.shutdown(wait=False,cancel_futures=True)
+                    return result
+                pending.add(pool.submit(_rhoWalks,*args,states,_RHO_ROUND_STEPS,dbits,rng.getrandbits(64)))
+
+def weakCurveReport(curve:FiniteFieldEllipticCurve, G:Point | tuple[int,int], groupOrder:int | None = None, minSecurityBits:int = 80) -> dict:
+    """
+    Return a dict describing how hard discrete logs in the subgroup generated by G are, and why it is weak if it is.
+
+        Parameters:
+                curve : The curve
+                G : The base point, as a Point or an (x,y) tuple
+                groupOrder : The number of points on the curve if known, computed with groupCardinality otherwise
+                minSecurityBits : Fewer bits of security than this is reported as weak
+
+        Details:
+                The keys are groupOrder, order, cofactor, factorization (of order), largestPrimeFactor, securityBits,\n
+                smooth, anomalous, embeddingDegree, singular, weak and reasons (a list of strings).\n
+                securityBits is log2 of the expected Pollard rho steps sqrt(pi*l/4) for the largest prime factor l of the order,\n
+                which is what Pohlig-Hellman leaves, and smooth means that is below minSecurityBits for a composite order.\n
+                Anomalous curves (l = p) fall to Smart's attack and an embedding degree k <= 20 (l | p^k - 1)\n
+                to the MOV/Frey-Ruck reduction to F_(p^k), singular curves reduce to the additive or multiplicative group.
+    """
+    import sympy.ntheory as nt
+    gx,gy = G
+    assert gx != None,"G must not be the point at infinity"
+    p = curve.p
+    if (groupOrder == None):
+        groupOrder = curve.groupCardinality()
+    order = curve.pointOrder(gx,gy,groupOrder)
+    factorization = nt.factorint(order)
+    largest = max(factorization)
+    securityBits = math.log2(math.sqrt(math.pi*largest/4))
+    embeddingDegree = None
+    if (largest != p):
+        for k in range(1,_MOV_MAX_DEGREE+1):
+            if (pow(p,k,largest) == 1):
+                embeddingDegree = k
+                break
+    report = {"groupOrder": groupOrder, "order": order, "cofactor": groupOrder//order, "factorization": factorization,
+              "largestPrimeFactor": largest, "securityBits": securityBits,
+              "smooth": largest < order and securityBits < minSecurityBits,
+              "anomalous": largest == p, "embeddingDegree": embeddingDegree, "singular": not _isNonSingular(curve)}
+    reasons = []
+    if (report["singular"]):
+        reasons.append("singular curve, discrete logs map to the additive or multiplicative group")
+    if (securityBits < minSecurityBits):
+        if (report["smooth"]):
+            reasons.append("smooth order, Pohlig-Hellman leaves a "+str(largest.bit_length())+" bit prime")
+        else:
+            reasons.append("prime order of only "+str(largest.bit_length())+" bits")
+    if (report["anomalous"]):
+        reasons.append("anomalous, the subgroup order is p (Smart's attack)")
+    if (embeddingDegree != None):
+        reasons.append("embedding degree "+str(embeddingDegree)+" (MOV/Frey-Ruck attack)")
+    report["weak"] = len(reasons) > 0
+    report["reasons"] = reasons
+    return report
@@ -0,0 +1,270 @@
+import hashlib
+import math
+import hmac
+import random
+from FFEllipticCurves import FiniteFieldEllipticCurve, FixedBaseMultiplier, _batchInverse, _isProbablePrime
+
+_BATCH_MIN_SIZE = 4
+_BATCH_COEFFICIENT_BITS = 128
+
+
+class ECDSA:
+    """
+    A class to represent ECDSA signing and verification with a fixed generator of prime order on a curve.
+
+    ...
+
+    Signing computes k*G with a FixedBaseMultiplier built on first use, and nonces are derived as in RFC 6979.
+    Signatures (r,s) are normalized so that R = k*G has an even y coordinate, which lets verifyBatch recover R from r.
+
+    Attributes
+    ----------
+    curve : FiniteFieldEllipticCurve
+        the curve the keys and the generator lie on
+    gx, gy : int
+        the coordinates of the generator G
+    n : int
+        the prime order of G
+    h : int
+        the cofactor, the number of points on the curve divided by n
+    hashName : str
+        the hashlib name of the hash applied to messages
+
+    Methods
+    -------
+    generateKeyPair(self):
+        Return a random private key d and its public key d*G.
+
+    publicKey(self, d):
+        Return the public key d*G of a private key d.
+
+    sign(self, message, d):
+        Return the signature (r,s) of a message.
+
+    verify(self, message, signature, publicKey):
+        Determine if signature is a valid signature of message under publicKey.
+
+    verifyBatch(self, messages, signatures, publicKeys):
+        Return for each signature whether it is valid, checking all of them together where possible.
+    """
+
+    def __init__(self, curve:FiniteFieldEllipticCurve, gx:int | None = None, gy:int | None = None, n:int | None = None, hashName:str = "sha256", window:int = 4, h:int | None = None):
+        """
+        Inits ECDSA on a curve with the generator (gx,gy) of order n.\n
+        For NamedCurves the generator, order and cofactor default to the curve's own, otherwise n is found with pointOrder.\n
+        n must be prime and n*G the point at infinity, a given n is checked.\n
+        The cofactor h is taken from the cached number of points if there is one, derived from n when n > 4*sqrt(p)\n
+        as in SEC1 3.1.1.2.1, or else the points are counted. A given h is checked against Hasse's bound.\n
+        window is the window of the FixedBaseMultiplier used for k*G.
+        """
+        if (gx == None and gy == None):
+            assert hasattr(curve,"generator"),"the generator must be given for curves that are not NamedCurves"
+            gx,gy = curve.generator.toTuple()
+            n = curve.n if n == None else n
+        assert isinstance(gx,int) and isinstance(gy,int) and curve.isElem(gx,gy),"the generator must be a non-infinity point on the curve"
+        hashlib.new(hashName)
+        self.curve = curve
+        self.gx = gx
+        self.gy = gy
+        self.n = curve.pointOrder(gx,gy) if n == None else n
+        assert isinstance(self.n,int) and _isProbablePrime(self.n),"the order of the generator must be prime"
+        assert curve.pointMultiplication(gx,gy,self.n) == (None,None),"n is not the order of the generator"
+        self.h = self._cofactor(h)
+        self.hashName = hashName
+        self._window = window
+        self._table = None
+
+    def _cofactor(self, h:int | None) -> int:
+        curve = self.curve
+        n = self.n
+        p = curve.p
+        cardinality = curve._cachedCardinality()
+        if (cardinality != None):
+            assert h == None or h*n == cardinality,"h*n is not the number of points on the curve"
+            return cardinality//n
+        if (h != None):
+            assert isinstance(h,int) and h >= 1 and (h*n-p-1)**2 <= 4*p,"h*n is outside Hasse's bound"
+            return h
+        if (n*n > 16*p):
+            # only one multiple of n lies in the Hasse interval p+1 +- 2*sqrt(p), the largest one below its upper end
+            return (p+1+math.isqrt(4*p))//n
+        return curve.groupCardinality()//n
+
+    def _generatorTable(self) -> FixedBaseMultiplier:
+        if (self._table == None):
+            self._table = FixedBaseMultiplier(self.curve,self.gx,self.gy,self._window,self.n.bit_length())
+        return self._table
+
+    def _bitsToInt(self, data:bytes) -> int:
+        # the leftmost bits of data as an integer with at most as many bits as n, SEC1 4.1.3 and RFC 6979 2.3.2
+        v = int.from_bytes(data,"big")
+        extra = 8*len(data) - self.n.bit_length()
+        return v>>extra if extra > 0 else v
+
+    def _hashMessage(self, message:bytes) -> int:
+        return self._bitsToInt(hashlib.new(self.hashName,message).digest())
+
+    def _nonces(self, d:int, message:bytes):
+        # the deterministic candidates for k from HMAC-DRBG over the private key and the message hash, RFC 6979 3.2,
+        # the next one is only drawn if the previous one gave r = 0 or s = 0 (step h.3)
+        n = self.n
+        size = (n.bit_length()+7)//8
+        digest = hashlib.new(self.hashName,message).digest()
+        h1 = (self._bitsToInt(digest) %n).to_bytes(size,"big")
+        key = d.to_bytes(size,"big")
+        V = b"\x01"*len(digest)
+        K = b"\x00"*len(digest)
+        K = hmac.new(K,V+b"\x00"+key+h1,self.hashName).digest()
+        V = hmac.new(K,V,self.hashName).digest()
+        K = hmac.new(K,V+b"\x01"+key+h1,self.hashName).digest()
+        V = hmac.new(K,V,self.hashName).digest()
+        while True:
+            T = b""
+            while (8*len(T) < n.bit_length()):
+                V = hmac.new(K,V,self.hashName).digest()
+                T = T+V
+            k = self._bitsToInt(T)
+            if (1 <= k < n):
+                yield k
+            K = hmac.new(K,V+b"\x00",self.hashName).digest()
+            V = hmac.new(K,V,self.hashName).digest()
+
+    def generateKeyPair(self) -> tuple[int,tuple[int,int]]:
+        """Return a private key d drawn uniformly from [1,n) by the system's random source, and its public key d*G"""
+        d = random.SystemRandom().randrange(1,self.n)
+        return d,self.publicKey(d)
+
+    def publicKey(self, d:int) -> tuple[int,int]:
+        """Return the public key d*G of the private key d"""
+        assert isinstance(d,int) and 1 <= d < self.n,"the private key must be an integer in [1,n)"
+        return self._generatorTable().multiply(d)
+
+    def sign(self, message:bytes, d:int) -> tuple[int,int]:
+        """
+        Return the ECDSA signature (r,s) of a message under the private key d.
+
+            Parameters:
+                    message : The message, hashed with hashName
+                    d : The private key
+
+            Details:
+                    k is derived deterministically from d and the message as in RFC 6979, R = k*G is read from the fixed-base table,\n
+                    r = x(R) mod n and s = k^-1 (e + r*d) mod n where e is the truncated hash.\n
+                    (r,s) and (r,n-s) are both valid, the one whose R has an even y is returned.\n
+                    https://en.wikipedia.org/wiki/Elliptic_Curve_Digital_Signature_Algorithm
+        """
+        assert isinstance(d,int) and 1 <= d < self.n,"the private key must be an integer in [1,n)"
+        n = self.n
+        e = self._hashMessage(message)
+        for k in self._nonces(d,message):
+            rx,ry = self._generatorTable().multiply(k)
+            r = rx %n
+            s = (pow(k,-1,n)*(e + r*d)) %n
+            if (r != 0 and s != 0):
+                break
+        if (ry & 1):
+            s = n-s
+        return r,s
+
+    def _checkInput(self, signature:tuple[int,int], publicKey:tuple[int,int]) -> bool:
+        r,s = signature[0],signature[1]
+        qx,qy = publicKey
+        if (not (1 <= r < self.n and 1 <= s < self.n and qx != None and self.curve.isElem(qx,qy))):
+            return False
+        # with a cofactor the curve has points outside the subgroup generated by G, SEC1 3.2.2.1
+        return self.h == 1 or self.curve.pointMultiplication(qx,qy,self.n) == (None,None)
+
+    def verify(self, message:bytes, signature:tuple[int,int], publicKey:tuple[int,int]) -> bool:
+        """
+        Return whether signature is a valid ECDSA signature of the message under publicKey.
+
+            Parameters:
+                    message : The message, hashed with hashName
+                    signature : The pair (r,s), a third entry as accepted by verifyBatch is ignored
+                    publicKey : The point Q = d*G, as a tuple or a Point
+
+            Details:
+                    With w = s^-1 mod n the signature is valid if x(u1*G + u2*Q) = r (mod n) for u1 = e*w and u2 = r*w.\n
+                    Unless the cofactor is 1, Q must also satisfy n*Q = O.\n
+                    Both products are computed in one joint multiplication, see multiScalarMultiplication.
+        """
+        if (not self._checkInput(signature,publicKey)):
+            return False
+        n = self.n
+        r,s = signature[0],signature[1]
+        w = pow(s,-1,n)
+        u1 = (self._hashMessage(message)*w) %n
+        u2 = (r*w) %n
+        x,y = self.curve.multiScalarMultiplication([(self.gx,self.gy),tuple(publicKey)],[u1,u2])
+        return x != None and x %n == r
+
+    def verifyBatch(self, messages:list[bytes], signatures:list[tuple[int,int]], publicKeys:list[tuple[int,int]]) -> list[bool]:
+        """
+        Return for each (message, signature, public key) whether the signature is valid, as verify would.
+
+            Parameters:
+                    messages : The messages
+                    signatures : The signatures (r,s), or (r,s,v) where v is the parity of the y coordinate of R
+                    publicKeys : The public keys, one per signature
+
+            Details:
+                    A valid signature has u1*G + u2*Q - R = 0 where R is the point with x = r and y of parity v (even by default,\n
+                    as produced by sign). With random 128 bit coefficients z_i the whole batch is valid if\n
+                    (sum z_i*u1_i)*G + sum (z_i*u2_i)*Q_i - sum z_i*R_i = 0, which is one multi-scalar multiplication over\n
+                    all distinct public keys and all R_i, with a single shared inversion for the s_i.\n
+                    A forged signature makes the sum vanish with probability about 2^-128.\n
+                    If the check fails the batch is split in halves and each half checked again, down to single verify calls,\n
+                    so the results are exact even for signatures whose R has an odd y but no v.\n
+                    On curves with a cofactor other than 1 every signature is checked on its own.
+        """
+        assert len(messages) == len(signatures) == len(publicKeys),"need exactly one signature and public key per message"
+        if (self.h != 1):
+            return [self.verify(m,sig,Q) for m,sig,Q in zip(messages,signatures,publicKeys)]
+        curve = self.curve
+        p = curve.p
+        n = self.n
+        results = [False]*len(messages)
+        ws = _batchInverse([sig[1] for sig in signatures],n,curve.field)
+        terms = []
+        for i,(message,sig,Q) in enumerate(zip(messages,signatures,publicKeys)):
+            if (not self._checkInput(sig,Q)):
+                continue
+            r = sig[0]
+            ry = curve._sqrtContext().sqrt(curve._y2Value(r)) if r < p else None
+            if (ry == None):
+                results[i] = self.verify(message,sig,Q)
+                continue
+            parity = sig[2] if len(sig) > 2 else 0
+            if ((ry & 1) != parity):
+                ry = p-ry
+            u1 = (self._hashMessage(message)*ws[i]) %n
+            u2 = (r*ws[i]) %n
+            terms.append((i,u1,u2,tuple(Q),(r,(-ry) %p)))
+        rng = random.SystemRandom()
+        pending = [terms]
+        while (pending):
+            batch = pending.pop()
+            if (len(batch) < _BATCH_MIN_SIZE):
+                for (i,u1,u2,Q,negR) in batch:
+                    results[i] = self.verify(messages[i],signatures[i],publicKeys[i])
+                continue
+            gScalar = 0
+            keyScalars = {}
+            points = []
+            scalars = []
+            for (i,u1,u2,Q,negR) in batch:
+                z = rng.getrandbits(_BATCH_COEFFICIENT_BITS) | 1
+                gScalar = gScalar + z*u1
+                keyScalars[Q] = (keyScalars.get(Q,0) + z*u2) %n
+                points.append(negR)
+                scalars.append(z)
+            points = [(self.gx,self.gy)] + list(keyScalars) + points
+            scalars = [gScalar %n] + list(keyScalars.values()) + scalars
+            if (curve.multiScalarMultiplication(points,scalars) == (None,None)):
+                for term in batch:
+                    results[term[0]] = True
+            else:
+                half = len(batch)//2
+                pending.append(batch[:half])
+                pending.append(batch[half:])
+        return results
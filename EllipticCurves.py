@@ -1,6 +1,9 @@
 import math
 import numbers
 
+_IS_ELEM_TOLERANCE = 0.0000001
+_ERROR_CORRECTION_MODES = ("step","final","none")
+
 
 class EllipticCurve:
     """
@@ -34,6 +37,24 @@ class EllipticCurve:
 
     pointMultiplication(self, x, y, s):
         Return the multiplication of point (x,y) by a scalar s.
+
+    y2ValueArray(self, x):
+        Return y^2 for every x coordinate of an array.
+
+    yvalueArray(self, x):
+        Return the non-negative y for every x coordinate of an array.
+
+    isElemArray(self, x, y):
+        Determine for every point of a pair of arrays if it is an element of the curve.
+
+    pointNegationArray(self, x, y):
+        Return the negation of every point of a pair of arrays.
+
+    pointAdditionArray(self, xp, yp, xq, yq):
+        Return the elementwise addition of two arrays of points.
+
+    pointMultiplicationArray(self, x, y, s, errorCorrection):
+        Return the elementwise multiplication of an array of points by an array of scalars.
     """    
     def __init__(self, a:numbers.Real, b:numbers.Real):
         """
@@ -75,7 +96,7 @@ class EllipticCurve:
         if x==None and y==None:
             return True
         elif isinstance(x, numbers.Number) and isinstance(y, numbers.Number):
-            return(abs(self.y2Value(x)-y**2) <= 0.0000001)
+            return(abs(self.y2Value(x)-y**2) <= _IS_ELEM_TOLERANCE)
         else:
             return False
     
@@ -176,3 +197,176 @@ class EllipticCurve:
                 tempx,tempy = self.pointAddition(tempx,tempy,tempx,tempy)
                             
             return self._errorCorrect(resx,resy)
+
+    def y2ValueArray(self, x):
+        """
+        Return the value of y^2 for every x coordinate of an array, NaN (the point at infinity) stays NaN.
+
+            Parameters:
+                    x : The x coordinates, anything np.asarray accepts
+        """
+        import numpy as np
+        x = np.asarray(x,dtype=np.float64)
+        return x**3 + self.a*x + self.b
+
+    def yvalueArray(self, x):
+        """
+        Return the non-negative value of y for every x coordinate of an array.\n
+        Where y^2 is negative there is no point on the curve and NaN is returned.
+
+            Parameters:
+                    x : The x coordinates
+        """
+        import numpy as np
+        with np.errstate(invalid="ignore"):
+            return np.sqrt(self.y2ValueArray(x))
+
+    def isElemArray(self, x, y):
+        """
+        Return a boolean array telling for every point (x[i],y[i]) whether it is an element of the curve.\n
+        The point at infinity is represented by NaN in both coordinates and is an element, as (None,None) is for isElem.
+
+            Parameters:
+                    x : The x coordinates
+                    y : The y coordinates
+        """
+        import numpy as np
+        x = np.asarray(x,dtype=np.float64)
+        y = np.asarray(y,dtype=np.float64)
+        infinity = np.isnan(x) & np.isnan(y)
+        with np.errstate(invalid="ignore"):
+            return infinity | (np.abs(self.y2ValueArray(x)-y*y) <= _IS_ELEM_TOLERANCE)
+
+    def pointNegationArray(self, x, y):
+        """
+        Return the negation (x,-y) of every point of a pair of arrays, NaN (the point at infinity) stays NaN.
+
+            Parameters:
+                    x : The x coordinates
+                    y : The y coordinates
+        """
+        import numpy as np
+        assert self.isElemArray(x,y).all(),"Not a point on the curve"
+        return np.array(x,dtype=np.float64),-np.asarray(y,dtype=np.float64)
+
+    def _errorCorrectArray(self, x, y):
+        import numpy as np
+        x = np.asarray(x,dtype=np.float64)
+        y2 = self.y2ValueArray(x)
+        # near a root of x^3 + ax + b rounding can leave y^2 slightly negative, the point there has y = 0,
+        # only clearly negative values, which are not on the curve, become NaN
+        scale = 1 + np.abs(x)**3 + abs(self.a)*np.abs(x) + abs(self.b)
+        y2 = np.where((y2 < 0) & (y2 >= -_IS_ELEM_TOLERANCE*scale),0.0,y2)
+        with np.errstate(invalid="ignore"):
+            r = np.sqrt(y2)
+        return x,np.where(y < 0,-r,r)
+
+    def _pointAdditionArrayUnchecked(self, xp, yp, xq, yq):
+        import numpy as np
+        with np.errstate(divide="ignore",invalid="ignore"):
+            infinityP = np.isnan(xp)
+            infinityQ = np.isnan(xq)
+            sameX = xp == xq
+            opposite = sameX & (yq == -yp)
+            double = sameX & ~opposite
+            slope = np.where(double,(3*xp*xp + self.a)/(2*yp),(yq-yp)/(xq-xp))
+            xr = slope*slope - xp - xq
+            yr = slope*(xp-xr) - yp
+        xr = np.where(opposite,np.nan,xr)
+        yr = np.where(opposite,np.nan,yr)
+        xr = np.where(infinityP,xq,np.where(infinityQ,xp,xr))
+        yr = np.where(infinityP,yq,np.where(infinityQ,yp,yr))
+        return xr,yr
+
+    def pointAdditionArray(self, xp, yp, xq, yq, errorCorrect:bool = True):
+        """
+        Return the elementwise addition of two arrays of points on the curve, as arrays (x,y).
+
+            Parameters:
+                    xp : The x coordinates of the points p
+                    yp : The y coordinates of the points p
+                    xq : The x coordinates of the points q
+                    yq : The y coordinates of the points q
+                    errorCorrect : Move y back onto the curve from x afterwards, as pointAddition does
+
+            Detail:
+                    The arrays are broadcast against each other, a single point can be added to an array of points.\n
+                    The point at infinity is represented by NaN in both coordinates, np.isnan(x) is the mask of infinite points.\n
+                    Every element follows the same rules as pointAddition: the identity, the negation, doubling and addition.\n
+                    The inputs are validated once with isElemArray instead of twice per point.
+        """
+        import numpy as np
+        xp,yp,xq,yq = np.broadcast_arrays(*[np.asarray(v,dtype=np.float64) for v in (xp,yp,xq,yq)])
+        assert self.isElemArray(xp,yp).all(), "p not on the curve"
+        assert self.isElemArray(xq,yq).all(), "q not on the curve"
+        xr,yr = self._pointAdditionArrayUnchecked(xp,yp,xq,yq)
+        if (errorCorrect):
+            return self._errorCorrectArray(xr,yr)
+        return xr,yr
+
+    def pointMultiplicationArray(self, x, y, s, errorCorrection:str = "final"):
+        """
+        Return the elementwise multiplication of an array of points on the curve by an array of non-negative integer scalars.
+
+            Parameters:
+                    x : The x coordinates
+                    y : The y coordinates
+                    s : The scalars, non-negative integers below 2^63
+                    errorCorrection : "final" (default) corrects y once at the end, "step" after every addition and doubling\n
+                                      like pointMultiplication, "none" never
+
+            Detail:
+                    The arrays are broadcast against each other, so one point times an array of scalars gives its multiples.\n
+                    Double-and-add runs over the bits of the largest scalar for all elements at once, elements whose bit is 0\n
+                    keep their running sum. The point at infinity is NaN in both coordinates, in the input and in the result.\n
+                    Rounding errors grow with the number of steps, "final" removes most of them at a fraction of the cost of "step".
+        """
+        import numpy as np
+        assert errorCorrection in _ERROR_CORRECTION_MODES,"errorCorrection must be 'step', 'final' or 'none'"
+        s = np.asarray(s)
+        assert s.dtype.kind in "iub" and (s.size == 0 or s.min() >= 0),"can only multiply by non negative integers"
+        x,y,s = np.broadcast_arrays(np.asarray(x,dtype=np.float64),np.asarray(y,dtype=np.float64),s.astype(np.int64))
+        assert self.isElemArray(x,y).all(),"must be points on the curve"
+        resx = np.full(x.shape,np.nan)
+        resy = np.full(x.shape,np.nan)
+        tempx,tempy = x.copy(),y.copy()
+        bits = int(s.max()).bit_length() if s.size else 0
+        step = errorCorrection == "step"
+        for i in range(bits):
+            bit = ((s>>i) & 1).astype(bool)
+            if (bit.any()):
+                sumx,sumy = self._pointAdditionArrayUnchecked(resx,resy,tempx,tempy)
+                if (step):
+                    sumx,sumy = self._errorCorrectArray(sumx,sumy)
+                resx = np.where(bit,sumx,resx)
+                resy = np.where(bit,sumy,resy)
+            if (i < bits-1):
+                tempx,tempy = self._pointAdditionArrayUnchecked(tempx,tempy,tempx,tempy)
+                if (step):
+                    tempx,tempy = self._errorCorrectArray(tempx,tempy)
+        if (errorCorrection != "none"):
+            return self._errorCorrectArray(resx,resy)
+        return resx,resy
+
+
+def pointsToArrays(points:list[tuple[numbers.Real,numbers.Real] | tuple[None,None]]):
+    """
+    Return a list of points (x,y) as two float arrays, the point at infinity (None,None) becomes NaN in both.
+
+        Parameters:
+                points : The points
+    """
+    import numpy as np
+    x = np.array([np.nan if px == None else px for (px,py) in points],dtype=np.float64)
+    y = np.array([np.nan if py == None else py for (px,py) in points],dtype=np.float64)
+    return x,y
+
+def arraysToPoints(x, y) -> list[tuple[float,float] | tuple[None,None]]:
+    """
+    Return two coordinate arrays as a list of points (x,y), NaN becomes the point at infinity (None,None).
+
+        Parameters:
+                x : The x coordinates
+                y : The y coordinates
+    """
+    return [(None,None) if math.isnan(px) else (px,py) for px,py in zip(x.tolist(),y.tolist())]
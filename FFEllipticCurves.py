@@ -1,8 +1,32 @@
-import numpy as np
-from scipy.interpolate import interp1d
-import matplotlib.pyplot as plt 
-import sympy.ntheory as nt
+from __future__ import annotations
 import warnings
+import math
+import sys
+import random
+import struct
+import os
+from collections import OrderedDict
+import FieldBackends
+from CurveCache import CurveCache, _DEFAULT_MAX_BYTES
+from Profiling import CurveProfile
+
+_WNAF_CACHE_MAXSIZE = 256
+_wnafTableCache = OrderedDict()
+_PIPPENGER_THRESHOLD = 32
+_BATCH_CHUNK_SIZE = 4096
+_VECTORIZED_MAX_P = 1<<31
+_VECTORIZED_CHUNK_SIZE = 1<<22
+_STREAMING_MAX_P = 1<<41
+_POINT_RECORD_DTYPE = "<u8"
+_POINT_RECORD_SIZE = 8
+_PRIME_TEST_BASES = (2,3,5,7,11,13,17,19,23,29,31,37,41)
+_MILLER_RABIN_EXACT_BOUND = 3317044064679887385961981
+_PLOT_SCATTER_MAX_P = 2000
+_PLOT_RESOLUTION = 512
+_PLOT_MAX_TICKS = 10
+_PLOT_EXACT_MAX_P = 1<<20
+_PLOT_SAMPLES = 1<<16
+_PLOT_MAX_SUBGROUP = 1<<16
 
 
 class FiniteFieldEllipticCurve:
@@ -19,15 +43,33 @@ class FiniteFieldEllipticCurve:
         coefficient of the constant term of the curve in Weierstrass form
     p : int
         prime number that the defines the finite field for which the curve takes values over
+    field : FieldBackends.FieldBackend
+        the field arithmetic backend used for inversions, powers and square roots
+    infinity : Point
+        the point at infinity of the curve
+    cache : CurveCache
+        the memory bounded cache of point lists, point orders and factorizations, cleared whenever a, b or p changes
 
     Methods
     -------
     isElem(self, x, y):
         Determine if (x,y) is an element of the curve.
 
+    point(self, x, y):
+        Return the validated Point (x,y) bound to the curve.
+
     generatePoints(self):
         Return all points on the curve including infinity.
+
+    pointIndex(self, x, y):
+        Return the position of the point (x,y) in generatePoints().
     
+    iterPoints(self, start, stop, chunk):
+        Yield the affine points with start <= x < stop as arrays, one chunk of x values at a time.
+
+    writePointTable(self, path, workers, chunk):
+        Write every affine point on the curve to a binary file of little-endian (x,y) records using a process pool.
+
     pointAddition(self, xp, yp, xq, yq):
         Return the addition of two points: (xp,yp) and (xq,yq).
 
@@ -43,36 +85,103 @@ class FiniteFieldEllipticCurve:
     pointDecompression(self, x, ybit):
         Return the decompression of the point (x,parity(y)) -> (x,y).
 
+    encodePoint(self, x, y, compressed):
+        Return the SEC1 encoding of the point (x,y) as bytes.
+
+    decodePoint(self, data):
+        Return the point (x,y) decoded from its SEC1 encoding.
+
+    encodePoints(self, points, compressed, out):
+        Return the SEC1 encodings of many points as one contiguous buffer of fixed size records.
+
+    decodePoints(self, data, compressed, asArray):
+        Return the points decoded and validated from a contiguous buffer of fixed size SEC1 records.
+
     groupCardinality(self):
         Return the number of points on the curve including infinity.
 
     subgroupCardinality(self, x, y):
         Return the number of points in the subgroup generated by <(x,y)>, including infinity.
 
+    pointOrder(self, x, y):
+        Return the order of the point (x,y).
+
     isGenerator(self, x, y):
         Determine if (x,y) is a generator of the whole curve.
 
+    generators(self):
+        Return all points that generate the whole curve.
+
     cofactor(self, gx, gy):
         Return the cofactor of the subgroup generated by (x,y).
+
+    batchPointAddition(self, pairs):
+        Return the additions P+Q for a list of pairs of points, sharing a single inversion.
+
+    batchNormalize(self, jacobianPoints):
+        Return the affine form of a list of Jacobian points, sharing a single inversion.
+
+    sharedSecretX(self, peerX, priv):
+        Return the x coordinate of priv*(peerX,y), computed without y.
+
+    multiScalarMultiplication(self, points, scalars):
+        Return the sum s1*P1 + s2*P2 + ... + sn*Pn.
+
+    precomputeGenerator(self, gx, gy, window):
+        Return a FixedBaseMultiplier for repeated multiplication of the point (gx,gy).
+
+    glvEndomorphism(self):
+        Return the GLVEndomorphism used to speed up multiplication on a = 0 curves, or None.
+
+    profile(self, methods):
+        Return a CurveProfile context manager that counts field operations and times methods while it is entered.
     """
     
-    def __init__(self, a:int, b:int, p:int):
+    def __init__(self, a:int, b:int, p:int, backend:str | None = None, checkPrime:bool = True, cacheBytes:int = _DEFAULT_MAX_BYTES):
         """
         Inits an elliptic curve over a finite field, y^2 = x^3 + ax + b (mod p) with corresponding a,b,p parameters.\n
-        p should be prime to form a well defined field. A warning will be thrown if p is (possibly) not prime.
+        p should be prime to form a well defined field. A warning will be thrown if p is (possibly) not prime.\n
+        backend names the FieldBackends backend used for inversions, powers and square roots, by default the active one.\n
+        checkPrime = False skips the primality test, for parameters already known to be good such as NamedCurves.\n
+        cacheBytes is the memory budget of the curve's CurveCache, 64 MiB by default.
         """
         self.a = a
         self.b = b
         self.p = p
-        if not nt.isprime(p):
+        self.field = FieldBackends.getBackend(backend)
+        self._cardinality = None
+        self._sqrt = None
+        self._glv = None
+        self.cache = CurveCache(cacheBytes)
+        self._profile = None
+        self.infinity = Point._unchecked(self,None,None)
+        if checkPrime and not _isProbablePrime(p):
             warnings.warn("Warning: P may not be a prime, this could lead to errors")
         
+    def __setattr__(self, name:str, value):
+        object.__setattr__(self,name,value)
+        if (name in ("a","b","p") and "cache" in self.__dict__):
+            self._invalidateCache()
+
+    def _invalidateCache(self):
+        # everything derived from a, b and p is stale once one of them changes
+        self.cache.clear()
+        self._cardinality = None
+        self._sqrt = None
+        self._glv = None
+
     def __str__(self) -> str:
         return "y^2 = x^3 + "+str(self.a)+"x + "+str(self.b)+" (mod "+str(self.p)+")"
     
     def _y2Value(self, x: int) -> int:
-        return ((pow(x,3,self.p)+ self.a*x + self.b) %self.p)
+        field = self.field
+        return ((field.mul(field.sqr(x,self.p),x,self.p)+ self.a*x + self.b) %self.p)
     
+    def _sqrtContext(self) -> FieldBackends.SqrtContext:
+        if (self._sqrt == None):
+            self._sqrt = FieldBackends.sqrtContext(self.p,self.field)
+        return self._sqrt
+
     def isElem(self, x: int | None, y: int | None) -> bool:
         """
         Return whether a point (x,y) is an element of the curve.\n
@@ -86,21 +195,183 @@ class FiniteFieldEllipticCurve:
             return True
         if ((isinstance(x, int) and not (isinstance(y, int))) or (isinstance(y, int) and not isinstance(x, int))):
             return False
-        return ((x**3  - y**2 + self.a*x + self.b)%self.p ==0)
+        return ((self._y2Value(x) - self.field.sqr(y,self.p))%self.p ==0)
     
-    def generatePoints(self) -> list[tuple[int,int] | tuple[None,None]]:
+    def point(self, x:int | None, y:int | None) -> "Point":
+        """
+        Return the point (x,y) as a Point bound to the curve, validating it once.
+
+            Parameters:
+                    x : The x coordinate
+                    y : The y coordinate
+        """
+        if (x==None and y==None):
+            return self.infinity
+        return Point(self,x,y)
+
+    def generatePoints(self, asArray:bool = False, vectorized:bool | None = None) -> list[tuple[int,int] | tuple[None,None]] | np.ndarray:
         """
         Return a list of all points on the curve, including the point at infinity (None,None)
-        """        
+
+            Parameters:
+                    asArray : Return an (N,2) int64 NumPy array of the affine points instead, the point at infinity is left out
+                    vectorized : Use the NumPy path, by default it is used whenever 2 < p < 2^31
+
+            Detail:
+                    The NumPy path builds the table of square roots of the squares y^2 mod p for 0 <= y <= (p-1)/2 once,\n
+                    evaluates x^3 + ax + b over all x in int64 arrays (all products stay below 2^62 for p < 2^31)\n
+                    and joins the two by indexing the table. Both are done in chunks of 2^22 values, so the memory needed is\n
+                    the result array of about 16p bytes, the int32 table of 4p bytes and a few hundred MB for the chunk, which does not grow with p.\n
+                    Points are ordered by x, then by y.\n
+                    The result is kept in the curve's cache, later calls return a copy, and the group order is cached with it.
+        """
+        if (vectorized == None):
+            vectorized = 2 < self.p < _VECTORIZED_MAX_P
+        key = ("points",bool(vectorized),bool(asArray))
+        points = self.cache.get(key)
+        if (points is None):
+            points = self._enumeratePoints(asArray,vectorized)
+            self.cache.put(key,points)
+            self._cardinality = ((self.a,self.b,self.p),len(points)+1 if asArray else len(points))
+        return points.copy()
+
+    def _enumeratePoints(self, asArray:bool, vectorized:bool) -> list[tuple[int,int] | tuple[None,None]] | np.ndarray:
+        if (vectorized):
+            pointArray = self._generatePointsArray()
+            if (asArray):
+                return pointArray
+            points = list(zip(pointArray[:,0].tolist(),pointArray[:,1].tolist()))
+            points.append((None,None))
+            return points
         points = []
+        sqrt = self._sqrtContext().sqrt
         for x in range(self.p):
-            if isQuadraticResidue(self.p, self._y2Value(x)):
-                squareRoots = sqrtModPrime(self.p, self._y2Value(x))
-                for y in squareRoots:
-                    points.append((x,y))
+            y = sqrt(self._y2Value(x))
+            if (y == None):
+                continue
+            points.append((x,y))
+            if (y != 0 and self.p != 2):
+                points.append((x,self.p-y))
+        if (asArray):
+            import numpy as np
+            return np.array(points,dtype=np.int64 if self.p < (1<<63) else object).reshape(-1,2)
         points.append((None,None))
         return points
 
+    def pointIndex(self, x:int | None, y:int | None) -> int:
+        """
+        Return the position of the point (x,y) in the list returned by generatePoints().\n
+        The index is built once from the point list and kept in the curve's cache.
+
+            Parameters:
+                    x : The x coordinate
+                    y : The y coordinate
+        """
+        assert self.isElem(x,y),"must be a point on the curve"
+        index = self.cache.get(("pointIndex",))
+        if (index is None):
+            index = {point: i for i,point in enumerate(self.generatePoints())}
+            self.cache.put(("pointIndex",),index)
+        return index[(x,y)]
+
+    def _generatePointsArray(self) -> np.ndarray:
+        import numpy as np
+        p = self.p
+        assert 2 < p < _VECTORIZED_MAX_P,"the vectorized path needs an odd prime p < 2^31"
+        rootOf = np.full(p,-1,dtype=np.int32)
+        for start in range(0,(p+1)//2,_VECTORIZED_CHUNK_SIZE):
+            roots = np.arange(start,min(start+_VECTORIZED_CHUNK_SIZE,(p+1)//2),dtype=np.int64)
+            squares = roots*roots
+            np.remainder(squares,p,out=squares)
+            rootOf[squares] = roots
+        a = self.a %p
+        b = self.b %p
+        # at most p + 2*sqrt(p) affine points by Hasse's bound, filled in place instead of concatenating chunks
+        points = np.empty((p+2*math.isqrt(p)+2,2),dtype=np.int64)
+        count = 0
+        for start in range(0,p,_VECTORIZED_CHUNK_SIZE):
+            xs = np.arange(start,min(start+_VECTORIZED_CHUNK_SIZE,p),dtype=np.int64)
+            y2 = ((((xs*xs) %p)*xs) %p + (a*xs) %p + b) %p
+            ys = rootOf[y2]
+            found = ys >= 0
+            xs = xs[found]
+            ys = ys[found].astype(np.int64)
+            nonZero = ys != 0
+            counts = 1 + nonZero
+            offsets = np.cumsum(counts) - counts
+            chunk = points[count:count+int(counts.sum())]
+            count = count+len(chunk)
+            chunk[offsets,0] = xs
+            chunk[offsets,1] = ys
+            chunk[offsets[nonZero]+1,0] = xs[nonZero]
+            chunk[offsets[nonZero]+1,1] = p-ys[nonZero]
+        return points[:count]
+
+    def iterPoints(self, start:int = 0, stop:int | None = None, chunk:int = 1<<20):
+        """
+        Yield the affine points (x,y) on the curve with start <= x < stop, as (N,2) int64 arrays ordered by x then y.
+
+            Parameters:
+                    start : The first x coordinate
+                    stop : One past the last x coordinate, defaults to p
+                    chunk : The number of x coordinates handled per yielded array
+
+            Detail:
+                    Only one chunk is held in memory at a time, so this works for p up to 2^41.\n
+                    x^3 + ax + b and its square roots are computed with a vectorized Tonelli-Shanks over the chunk,\n
+                    multiplying in int64 by splitting one factor into 21 bit halves when p >= 2^31.
+        """
+        p = self.p
+        assert 2 < p < _STREAMING_MAX_P,"streaming enumeration needs an odd prime p < 2^41"
+        if (stop == None):
+            stop = p
+        assert 0 <= start <= stop <= p,"need 0 <= start <= stop <= p"
+        for lo in range(start,stop,chunk):
+            yield _pointsInRange(self.a,self.b,p,lo,min(lo+chunk,stop))
+
+    def writePointTable(self, path:str, workers:int | None = None, chunk:int = 1<<20) -> int:
+        """
+        Write every affine point on the curve to a binary file and return the number of points written.
+
+            Parameters:
+                    path : The file to write
+                    workers : The number of worker processes, defaults to the number of cores
+                    chunk : The number of x coordinates each worker handles at a time
+
+            Detail:
+                    Each point is a fixed width record of two little-endian uint64 values x and y, ordered by x then y.\n
+                    The x range is split into shards that a process pool enumerates with iterPoints, each into its own part file.\n
+                    The parts are then copied in order into the final memory-mapped file.\n
+                    The result can be reopened without copying using openPointTable(path).
+        """
+        import numpy as np
+        p = self.p
+        assert 2 < p < _STREAMING_MAX_P,"streaming enumeration needs an odd prime p < 2^41"
+        if (workers == None):
+            workers = os.cpu_count() or 1
+        shards = max(1,min(4*workers,-(-p//chunk)))
+        bounds = [(p*i)//shards for i in range(shards+1)]
+        parts = [path+".part"+str(i) for i in range(shards)]
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_writePointShard,[self.a]*shards,[self.b]*shards,[p]*shards,
+                                   bounds[:-1],bounds[1:],[chunk]*shards,parts))
+        total = sum(counts)
+        with open(path,"wb") as f:
+            f.truncate(2*_POINT_RECORD_SIZE*total)
+        if (total > 0):
+            table = np.memmap(path,dtype=_POINT_RECORD_DTYPE,mode="r+",shape=(total,2))
+            offset = 0
+            for part,count in zip(parts,counts):
+                if (count > 0):
+                    table[offset:offset+count] = np.fromfile(part,dtype=_POINT_RECORD_DTYPE).reshape(-1,2)
+                offset = offset+count
+            table.flush()
+            del table
+        for part in parts:
+            os.remove(part)
+        return total
+
     def pointAddition(self, xp:int | None, yp:int | None, xq:int | None, yq:int | None) -> tuple[int,int] | tuple[None,None]:
         """
         Return the addition of 2 points on the curve
@@ -124,7 +395,9 @@ class FiniteFieldEllipticCurve:
 
         assert self.isElem(xp,yp), "p not on the curve"
         assert self.isElem(xq,yq), "q not on the curve"
+        return self._pointAdditionUnchecked(xp,yp,xq,yq)
 
+    def _pointAdditionUnchecked(self, xp:int | None, yp:int | None, xq:int | None, yq:int | None) -> tuple[int,int] | tuple[None,None]:
         if (xp == yp == None):
             return xq,yq
         if (xq == yq == None):
@@ -134,15 +407,17 @@ class FiniteFieldEllipticCurve:
         elif (xq==xp and yq==yp):
             return self._pointDouble(xp,yp)
         else:
-            lambdaP = (((yq-yp)%self.p) * pow((xq-xp),-1,self.p)) %self.p
-            xr = (pow(lambdaP,2,self.p) - xp - xq)%self.p
-            yr = (lambdaP*(xp-xr) - yp) %self.p
+            field = self.field
+            lambdaP = field.mul((yq-yp)%self.p, field.inv(xq-xp,self.p), self.p)
+            xr = (field.sqr(lambdaP,self.p) - xp - xq)%self.p
+            yr = (field.mul(lambdaP,xp-xr,self.p) - yp) %self.p
             return xr,yr
 
     def _pointDouble(self, x:int, y:int) -> tuple[int,int]:
-        lambdaP = (((3*pow(x,2,self.p) + self.a)%self.p) * pow(2*y,-1,self.p)) %self.p 
-        xr = (pow(lambdaP,2,self.p) - 2*x)%self.p
-        yr = (lambdaP*(x-xr) - y) %self.p
+        field = self.field
+        lambdaP = field.mul((3*field.sqr(x,self.p) + self.a)%self.p, field.inv(2*y,self.p), self.p)
+        xr = (field.sqr(lambdaP,self.p) - 2*x)%self.p
+        yr = (field.mul(lambdaP,x-xr,self.p) - y) %self.p
         return xr,yr
     
     def _naivePointMultiplication(self, x:int | None, y:int | None, s:int) -> tuple[int,int] | tuple[None,None]:
@@ -154,10 +429,132 @@ class FiniteFieldEllipticCurve:
             return None,None
         nextx, nexty = x,y
         for i in range(s-1):
-            nextx, nexty = self.pointAddition(x,y,nextx,nexty)
+            nextx, nexty = self._pointAdditionUnchecked(x,y,nextx,nexty)
         return nextx,nexty
     
-    def pointMultiplication(self, x:int | None, y:int | None, s:int) -> tuple[int,int] | tuple[None,None]:
+    def _toJacobian(self, x:int | None, y:int | None) -> tuple[int,int,int]:
+        if (x==None and y==None):
+            return 1,1,0
+        return x,y,1
+
+    def _fromJacobian(self, X:int, Y:int, Z:int) -> tuple[int,int] | tuple[None,None]:
+        if (Z%self.p==0):
+            return None,None
+        zInv = self.field.inv(Z,self.p)
+        zInv2 = (zInv*zInv) %self.p
+        return (X*zInv2) %self.p, (Y*zInv2*zInv) %self.p
+
+    def _jacobianDouble(self, X:int, Y:int, Z:int) -> tuple[int,int,int]:
+        p = self.p
+        if (Z==0 or Y==0):
+            return 1,1,0
+        XX = (X*X) %p
+        YY = (Y*Y) %p
+        YYYY = (YY*YY) %p
+        ZZ = (Z*Z) %p
+        S = (4*X*YY) %p
+        M = (3*XX + self.a*ZZ*ZZ) %p
+        X3 = (M*M - 2*S) %p
+        Y3 = (M*(S-X3) - 8*YYYY) %p
+        Z3 = (2*Y*Z) %p
+        return X3,Y3,Z3
+
+    def _jacobianMixedAdd(self, X1:int, Y1:int, Z1:int, x2:int, y2:int) -> tuple[int,int,int]:
+        p = self.p
+        if (Z1==0):
+            return x2,y2,1
+        Z1Z1 = (Z1*Z1) %p
+        U2 = (x2*Z1Z1) %p
+        S2 = (y2*Z1*Z1Z1) %p
+        H = (U2-X1) %p
+        r = (S2-Y1) %p
+        if (H==0):
+            if (r==0):
+                return self._jacobianDouble(X1,Y1,Z1)
+            return 1,1,0
+        HH = (H*H) %p
+        HHH = (H*HH) %p
+        V = (X1*HH) %p
+        X3 = (r*r - HHH - 2*V) %p
+        Y3 = (r*(V-X3) - Y1*HHH) %p
+        Z3 = (Z1*H) %p
+        return X3,Y3,Z3
+
+    def _jacobianAdd(self, X1:int, Y1:int, Z1:int, X2:int, Y2:int, Z2:int) -> tuple[int,int,int]:
+        p = self.p
+        if (Z1==0):
+            return X2,Y2,Z2
+        if (Z2==0):
+            return X1,Y1,Z1
+        Z1Z1 = (Z1*Z1) %p
+        Z2Z2 = (Z2*Z2) %p
+        U1 = (X1*Z2Z2) %p
+        U2 = (X2*Z1Z1) %p
+        S1 = (Y1*Z2*Z2Z2) %p
+        S2 = (Y2*Z1*Z1Z1) %p
+        H = (U2-U1) %p
+        r = (S2-S1) %p
+        if (H==0):
+            if (r==0):
+                return self._jacobianDouble(X1,Y1,Z1)
+            return 1,1,0
+        HH = (H*H) %p
+        HHH = (H*HH) %p
+        V = (U1*HH) %p
+        X3 = (r*r - HHH - 2*V) %p
+        Y3 = (r*(V-X3) - S1*HHH) %p
+        Z3 = (Z1*Z2*H) %p
+        return X3,Y3,Z3
+
+    def _jacobianPointMultiplication(self, x:int, y:int, s:int) -> tuple[int,int,int]:
+        X,Y,Z = 1,1,0
+        for bit in bin(s)[2:]:
+            X,Y,Z = self._jacobianDouble(X,Y,Z)
+            if (bit == '1'):
+                X,Y,Z = self._jacobianMixedAdd(X,Y,Z,x,y)
+        return X,Y,Z
+
+    def _wnafTable(self, x:int, y:int, w:int) -> list[tuple[int,int] | tuple[None,None]]:
+        key = (self.a,self.b,self.p,x,y,w)
+        table = _wnafTableCache.get(key)
+        if table is not None:
+            _wnafTableCache.move_to_end(key)
+            return table
+        X2,Y2,Z2 = self._jacobianDouble(x,y,1)
+        jacobianTable = [(x,y,1)]
+        for i in range(1, 1<<(w-2)):
+            jacobianTable.append(self._jacobianAdd(*jacobianTable[-1],X2,Y2,Z2))
+        table = self.batchNormalize(jacobianTable)
+        _wnafTableCache[key] = table
+        if (len(_wnafTableCache) > _WNAF_CACHE_MAXSIZE):
+            _wnafTableCache.popitem(last=False)
+        return table
+
+    def _wnafPointMultiplication(self, x:int, y:int, s:int, w:int) -> tuple[int,int,int]:
+        table = self._wnafTable(x,y,w)
+        X,Y,Z = 1,1,0
+        for digit in reversed(_wnaf(s,w)):
+            X,Y,Z = self._jacobianDouble(X,Y,Z)
+            if (digit > 0):
+                tx,ty = table[digit>>1]
+                if (tx != None):
+                    X,Y,Z = self._jacobianMixedAdd(X,Y,Z,tx,ty)
+            elif (digit < 0):
+                tx,ty = table[(-digit)>>1]
+                if (tx != None):
+                    X,Y,Z = self._jacobianMixedAdd(X,Y,Z,tx,(-ty)%self.p)
+        return X,Y,Z
+
+    def _affinePointMultiplication(self, x:int, y:int, s:int) -> tuple[int,int] | tuple[None,None]:
+        resx,resy = None,None
+        tempx,tempy = x,y
+        for bit in bin(s)[2:][::-1]:
+            if (bit == '1'):
+                resx,resy = self._pointAdditionUnchecked(resx,resy,tempx,tempy)
+            tempx,tempy = self._pointAdditionUnchecked(tempx,tempy,tempx,tempy)
+        return resx,resy
+
+    def pointMultiplication(self, x:int | None, y:int | None, s:int, coordinates:str = "jacobian", window:int = 4) -> tuple[int,int] | tuple[None,None]:
         """
         Return the multiplication of a point on the curve by a non-negative integer scalar.
 
@@ -165,47 +562,328 @@ class FiniteFieldEllipticCurve:
                     x : The x coordinate
                     y : The y coordinate
                     s : The scalar
+                    coordinates : The coordinate system used internally, "jacobian" (default) or "affine"
+                    window : The width w of the NAF used with "jacobian" coordinates, 1 gives plain double-and-add
             
             Detail:
                     Multiplying any point 0 returns the point at infinity.\n
                     Multiplying the point at infinity by any scalar returns the point at infinity.\n
                     This implementation uses the double-and-add algorithm.\n
+                    With "jacobian" coordinates a point (X,Y,Z) represents the affine point (X/Z^2, Y/Z^3).\n
+                    Doubling and mixed addition are then inversion free, and a single inversion converts the result back to affine.\n
+                    With "affine" coordinates every step is an affine addition, which costs one inversion each.\n
+                    With "jacobian" coordinates and window w >= 2 the scalar is recoded in width-w NAF form.\n
+                    Only the odd multiples P, 3P, ..., (2^(w-1)-1)P are needed, they are kept in a bounded LRU cache keyed by curve and point.\n
+                    This leaves roughly one addition per w+1 bits instead of one per 2 bits.\n
+                    On curves with a GLVEndomorphism (a = 0, p = 1 (mod 3) and a known prime group order, see glvEndomorphism)\n
+                    s is split into two half length scalars that share their doublings, which halves the number of doublings.\n
+                    https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication#w-ary_non-adjacent_form_(wNAF)_method\n
                     https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication
         """
         assert isinstance(s,int) and s>=0,"can only multiply by non negative integers"
         assert self.isElem(x,y),"must be a point on the curve"
+        assert coordinates in ("jacobian","affine"),"coordinates must be 'jacobian' or 'affine'"
+        assert isinstance(window,int) and window>=1,"window must be a positive integer"
+        return self._pointMultiplicationUnchecked(x,y,s,coordinates,window)
+
+    def _pointMultiplicationUnchecked(self, x:int | None, y:int | None, s:int, coordinates:str = "jacobian", window:int = 4) -> tuple[int,int] | tuple[None,None]:
         if (s==0 or (x==None and y==None)):
             return None,None
-        else:
-            s = bin(s)
-            s = str(s)
-            s = s[2:]
-            resx,resy = None,None
-            tempx,tempy = x,y
-            for bit in s[::-1]:
-                if (bit == '1'):
-                    resx,resy = self.pointAddition(resx,resy,tempx,tempy)
-                tempx,tempy = self.pointAddition(tempx,tempy,tempx,tempy)
-                            
-            return resx,resy
-
-    def generatePointsFromGenerator(self, x:int | None, y:int | None) -> list[tuple[int,int] | tuple[None,None]]:
+        if (coordinates == "affine"):
+            return self._affinePointMultiplication(x,y,s)
+        if (window == 1 or s < (1<<window)):
+            return self._fromJacobian(*self._jacobianPointMultiplication(x,y,s))
+        glv = self.glvEndomorphism()
+        if (glv != None):
+            return self._fromJacobian(*glv._jacobianMultiply(x,y,s,window))
+        return self._fromJacobian(*self._wnafPointMultiplication(x,y,s,window))
+
+    def _xOnlyDouble(self, X:int, Z:int) -> tuple[int,int]:
+        p = self.p
+        XX = (X*X) %p
+        ZZ = (Z*Z) %p
+        aZZ = (self.a*ZZ) %p
+        bZZZ = (self.b*ZZ*Z) %p
+        t = XX-aZZ
+        X2 = (t*t - 8*X*bZZZ) %p
+        Z2 = (4*(Z*X*(XX + aZZ) + Z*bZZZ)) %p
+        return X2,Z2
+
+    def _xOnlyDifferentialAdd(self, X1:int, Z1:int, X2:int, Z2:int, x0:int) -> tuple[int,int]:
+        p = self.p
+        Z1Z2 = (Z1*Z2) %p
+        X1Z2 = (X1*Z2) %p
+        X2Z1 = (X2*Z1) %p
+        t = (X1*X2 - self.a*Z1Z2) %p
+        X3 = (t*t - 4*self.b*Z1Z2*(X1Z2 + X2Z1)) %p
+        d = X1Z2 - X2Z1
+        Z3 = (x0*((d*d) %p)) %p
+        return X3,Z3
+
+    def sharedSecretX(self, peerX:int | tuple[int,int] | None, priv:int) -> int | None:
+        """
+        Return the x coordinate of priv*Q, where Q is the peer's public key with x coordinate peerX.
+
+            Parameters:
+                    peerX : The x coordinate of the peer's public key, or its compression (x,parity(y))
+                    priv : The private key, a non-negative integer
+
+            Detail:
+                    Since x(-Q) = x(Q), the x coordinate of priv*Q does not depend on y, so y is never recovered.\n
+                    This uses the Montgomery ladder on (X:Z) coordinates with the Brier-Joye doubling and differential addition,\n
+                    which roughly halves the field operations of a full pointMultiplication.\n
+                    Every scalar is processed over the same number of bits with one doubling and one addition per bit.\n
+                    peerX is checked to be the x coordinate of a point on the curve rather than on its twist.\n
+                    Returns None if priv*Q is the point at infinity, peerX = None stands for the point at infinity.\n
+                    https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication#Montgomery_ladder
+        """
+        if (isinstance(peerX,tuple)):
+            peerX = peerX[0]
+        assert isinstance(priv,int) and priv>=0,"can only multiply by non negative integers"
+        if (peerX == None):
+            return None
+        assert isinstance(peerX,int) and 0 <= peerX < self.p,"peerX must be a field element"
+        p = self.p
+        x0 = peerX
+        assert isQuadraticResidue(p,self._y2Value(x0)),str(x0)+" is not the x coordinate of a point on the curve"
+        if (x0 == 0 or self._y2Value(x0) == 0):
+            x,y = self._pointMultiplicationUnchecked(x0,self._sqrtContext().sqrt(self._y2Value(x0)),priv)
+            return x
+        R0 = (1,0)
+        R1 = (x0,1)
+        for i in range(max(p.bit_length()+1,priv.bit_length())-1,-1,-1):
+            if ((priv>>i) & 1):
+                R0 = self._xOnlyDifferentialAdd(*R0,*R1,x0)
+                R1 = self._xOnlyDouble(*R1)
+            else:
+                R1 = self._xOnlyDifferentialAdd(*R0,*R1,x0)
+                R0 = self._xOnlyDouble(*R0)
+        X,Z = R0
+        if (Z == 0):
+            return None
+        return (X*self.field.inv(Z,p)) %p
+
+    def batchNormalize(self, jacobianPoints:list[tuple[int,int,int]]) -> list[tuple[int,int] | tuple[None,None]]:
+        """
+        Return the affine points (X/Z^2, Y/Z^3) for a list of Jacobian points (X,Y,Z).
+
+            Parameters:
+                    jacobianPoints : The Jacobian points, Z=0 represents the point at infinity
+
+            Detail:
+                    All Z coordinates are inverted together with Montgomery's simultaneous inversion trick,\n
+                    so the whole batch costs a single inversion plus a few multiplications per point.
+        """
+        p = self.p
+        zInvs = _batchInverse([Z for (X,Y,Z) in jacobianPoints], p, self.field)
+        points = []
+        for (X,Y,Z),zInv in zip(jacobianPoints,zInvs):
+            if (zInv == 0):
+                points.append((None,None))
+            else:
+                zInv2 = (zInv*zInv) %p
+                points.append(((X*zInv2) %p, (Y*zInv2*zInv) %p))
+        return points
+
+    def batchPointAddition(self, pairs:list[tuple[tuple[int,int] | tuple[None,None], tuple[int,int] | tuple[None,None]]]) -> list[tuple[int,int] | tuple[None,None]]:
+        """
+        Return the additions P+Q for a list of pairs of points (P,Q) on the curve.
+
+            Parameters:
+                    pairs : The pairs of points ((xp,yp),(xq,yq)) to add
+
+            Detail:
+                    Each addition or doubling needs the inverse of one denominator, (xq-xp) or 2y.\n
+                    These are all inverted together with Montgomery's simultaneous inversion trick,\n
+                    so each pair costs about 3 extra multiplications plus 1/n of an inversion.\n
+                    The special cases are handled as in pointAddition.
+        """
+        p = self.p
+        denominators = []
+        for (xp,yp),(xq,yq) in pairs:
+            assert self.isElem(xp,yp), "p not on the curve"
+            assert self.isElem(xq,yq), "q not on the curve"
+            if (xp == None or xq == None or (xq==xp and (yq+yp)%p==0)):
+                denominators.append(0)
+            elif (xq==xp):
+                denominators.append(2*yp)
+            else:
+                denominators.append(xq-xp)
+        inverses = _batchInverse(denominators, p, self.field)
+        results = []
+        for ((xp,yp),(xq,yq)),inverse in zip(pairs,inverses):
+            if (xp == None):
+                results.append((xq,yq))
+            elif (xq == None):
+                results.append((xp,yp))
+            elif (inverse == 0):
+                results.append((None,None))
+            else:
+                if (xq==xp):
+                    lambdaP = (((3*xp*xp + self.a)%p) * inverse) %p
+                else:
+                    lambdaP = (((yq-yp)%p) * inverse) %p
+                xr = (lambdaP*lambdaP - xp - xq)%p
+                yr = (lambdaP*(xp-xr) - yp) %p
+                results.append((xr,yr))
+        return results
+
+    def _strausMultiScalarMultiplication(self, points:list[tuple[int,int]], scalars:list[int], w:int = 4) -> tuple[int,int,int]:
+        p = self.p
+        tables = [self._wnafTable(x,y,w) for (x,y) in points]
+        digits = [_wnaf(s,w) for s in scalars]
+        X,Y,Z = 1,1,0
+        for i in range(max(len(d) for d in digits)-1,-1,-1):
+            X,Y,Z = self._jacobianDouble(X,Y,Z)
+            for table,d in zip(tables,digits):
+                if (i >= len(d) or d[i] == 0):
+                    continue
+                digit = d[i]
+                tx,ty = table[abs(digit)>>1]
+                if (tx == None):
+                    continue
+                if (digit < 0):
+                    ty = (-ty)%p
+                X,Y,Z = self._jacobianMixedAdd(X,Y,Z,tx,ty)
+        return X,Y,Z
+
+    def _pippengerMultiScalarMultiplication(self, points:list[tuple[int,int]], scalars:list[int]) -> tuple[int,int,int]:
+        c = max(1, len(points).bit_length()-2)
+        mask = (1<<c)-1
+        maxBits = max(s.bit_length() for s in scalars)
+        X,Y,Z = 1,1,0
+        for shift in range(((maxBits-1)//c)*c,-1,-c):
+            for i in range(c):
+                X,Y,Z = self._jacobianDouble(X,Y,Z)
+            buckets = [(1,1,0)]*mask
+            for (x,y),s in zip(points,scalars):
+                digit = (s>>shift) & mask
+                if (digit):
+                    buckets[digit-1] = self._jacobianMixedAdd(*buckets[digit-1],x,y)
+            running = (1,1,0)
+            windowSum = (1,1,0)
+            for bucket in reversed(buckets):
+                running = self._jacobianAdd(*running,*bucket)
+                windowSum = self._jacobianAdd(*windowSum,*running)
+            X,Y,Z = self._jacobianAdd(X,Y,Z,*windowSum)
+        return X,Y,Z
+
+    def multiScalarMultiplication(self, points:list[tuple[int,int] | tuple[None,None]], scalars:list[int], method:str = "auto") -> tuple[int,int] | tuple[None,None]:
+        """
+        Return the sum s1*P1 + s2*P2 + ... + sn*Pn of points on the curve multiplied by non-negative integer scalars.
+
+            Parameters:
+                    points : The points (x,y) to multiply
+                    scalars : The scalars, one per point
+                    method : "straus", "pippenger" or "auto" (default), which picks by the number of points
+
+            Detail:
+                    Straus' method interleaves the width-w NAF expansions of all scalars so the doublings are shared.\n
+                    Pippenger's bucket method sorts the points into buckets by window digit and sums each bucket once,\n
+                    which needs about b/c * (n + 2^c) additions for b bit scalars and c bit windows.\n
+                    Straus is used for fewer than 32 points and Pippenger otherwise.\n
+                    With a GLVEndomorphism every term s*P is first split into k1*P + k2*phi(P) with half length k1,k2.\n
+                    https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication#Straus's_algorithm
+        """
+        assert len(points) == len(scalars),"need exactly one scalar per point"
+        assert method in ("auto","straus","pippenger"),"method must be 'auto', 'straus' or 'pippenger'"
+        terms = []
+        for (x,y),s in zip(points,scalars):
+            assert isinstance(s,int) and s>=0,"can only multiply by non negative integers"
+            assert self.isElem(x,y),str(x)+","+str(y)+" is not a point on the curve"
+            if (s != 0 and x != None):
+                terms.append(((x,y),s))
+        glv = self.glvEndomorphism()
+        if (glv != None):
+            terms = glv._splitTerms(terms)
+        if (len(terms) == 0):
+            return None,None
+        points = [t[0] for t in terms]
+        scalars = [t[1] for t in terms]
+        if (method == "auto"):
+            method = "straus" if len(points) < _PIPPENGER_THRESHOLD else "pippenger"
+        if (method == "straus"):
+            return self._fromJacobian(*self._strausMultiScalarMultiplication(points,scalars))
+        return self._fromJacobian(*self._pippengerMultiScalarMultiplication(points,scalars))
+
+    def precomputeGenerator(self, gx:int, gy:int, window:int = 4, bits:int | None = None) -> "FixedBaseMultiplier":
+        """
+        Return a FixedBaseMultiplier that computes k*(gx,gy) using only table lookups and additions.
+
+            Parameters:
+                    gx : The x coordinate of the generator
+                    gy : The y coordinate of the generator
+                    window : The number of scalar bits consumed per table row
+                    bits : The largest scalar bit length covered by the table, defaults to the bit length of p plus one
+        """
+        return FixedBaseMultiplier(self, gx, gy, window, bits)
+
+    def profile(self, methods:bool = True) -> CurveProfile:
+        """
+        Return a CurveProfile that records operation counts and method timings of this curve while it is entered.
+
+            Parameters:
+                    methods : Also record the calls and wall time of every public method
+
+            Detail:
+                    with curve.profile() as stats:\n
+                        curve.pointMultiplication(x,y,k)\n
+                    stats.field then holds the number of mul, sqr, inv, pow, legendre and sqrt operations, stats.group the\n
+                    point formulas evaluated and stats.validation the isElem checks, see CurveProfile.toDict and toPrometheus.\n
+                    The counters are only attached to the curve inside the with block, outside it there is no overhead at all.
+        """
+        return CurveProfile(self,methods)
+
+    def glvEndomorphism(self) -> "GLVEndomorphism | None":
+        """
+        Return the GLVEndomorphism of the curve, or None if multiplication cannot use one.
+
+            Detail:
+                    Curves y^2 = x^3 + b with p = 1 (mod 3) have the endomorphism (x,y) -> (beta*x,y) = lambda*(x,y).\n
+                    Using it needs the group order, so it is only detected once the cardinality is cached on the curve,\n
+                    for example by groupCardinality or NamedCurves, and only when that order is prime so every point qualifies.\n
+                    beta, lambda and the lattice basis are computed once and kept on the curve.
+        """
+        key = (self.a,self.b,self.p)
+        if (self._glv != None and self._glv[0] == key):
+            return self._glv[1]
+        if (self.a %self.p != 0 or self.p%3 != 1 or self.b %self.p == 0):
+            self._glv = (key,None)
+            return None
+        groupOrder = self._cachedCardinality()
+        if (groupOrder == None):
+            return None
+        self._glv = (key,GLVEndomorphism.fromCurve(self,groupOrder))
+        return self._glv[1]
+
+    def generatePointsFromGenerator(self, x:int | None, y:int | None, limit:int | None = None) -> list[tuple[int,int] | tuple[None,None]]:
         """
         Return the set of all points in the subgroup generated by the generator (x,y) including the point at infinity (None,None).
 
             Parameters:
                     x : The x coordinate of the generator  
                     y : The y coordinate of the generator  
+                    limit : Stop after the multiples 1*(x,y) ... limit*(x,y), the point at infinity is only included if it is reached
         """
         assert(self.isElem(x,y)),"not a point on the curve"
         if (x==None and y==None):
             return [(None,None)]
-        nextx,nexty = self.pointAddition(x,y,x,y)
-        points=[(x,y)]
-        while (nextx != x or nexty != y):
-            points.append((nextx,nexty))
-            nextx,nexty= self.pointAddition(x,y,nextx,nexty)
-
+        points=[]
+        chunk=[]
+        X,Y,Z = x,y,1
+        count = 0
+        while (Z != 0):
+            if (limit != None and count == limit):
+                points.extend(self.batchNormalize(chunk))
+                return points
+            count = count+1
+            chunk.append((X,Y,Z))
+            if (len(chunk) == _BATCH_CHUNK_SIZE):
+                points.extend(self.batchNormalize(chunk))
+                chunk=[]
+            X,Y,Z = self._jacobianMixedAdd(X,Y,Z,x,y)
+        points.extend(self.batchNormalize(chunk))
+        points.append((None,None))
         return points
 
     def pointCompression(self, x:int, y:int) -> tuple[int,int]:
@@ -240,14 +918,262 @@ class FiniteFieldEllipticCurve:
                     This can be encoded as the parity of y (0 or 1).\n 
                     These are all invertible functions so can be decoded easily.\n
         """
-        y = sqrtModPrime(self.p,pow(x, 3, self.p) + self.a * x + self.b)[0]
+        y = self._sqrtContext().sqrt(self._y2Value(x))
+        assert y != None,"no point on the curve has this x coordinate"
         if bool(ybit) == bool(y & 1):
             return (x, y)
         return x, self.p - y
 
-    def groupCardinality(self) -> int:
-        """Return the number of elements in the curve including the point at infinity"""
-        return len(self.generatePoints())
+    def encodePoint(self, x:int | None, y:int | None, compressed:bool = True) -> bytes:
+        """
+        Return the SEC1 encoding of a point on the curve.
+
+            Parameters:
+                    x : The x coordinate
+                    y : The y coordinate
+                    compressed : Use the compressed form 02/03 || x instead of the uncompressed form 04 || x || y
+
+            Details:
+                    Coordinates are big-endian and ceil(log2(p)/8) bytes wide, the point at infinity is the single byte 00.\n
+                    https://www.secg.org/sec1-v2.pdf (section 2.3.3)
+        """
+        assert self.isElem(x,y),"must be a point on the curve"
+        if (x == None):
+            return b"\x00"
+        size = (self.p.bit_length()+7)//8
+        if (compressed):
+            return bytes((2+(y & 1),)) + x.to_bytes(size,"big")
+        return b"\x04" + x.to_bytes(size,"big") + y.to_bytes(size,"big")
+
+    def decodePoint(self, data:bytes) -> tuple[int,int] | tuple[None,None]:
+        """
+        Return the point decoded from its SEC1 encoding, checking that it lies on the curve.
+
+            Parameters:
+                    data : The compressed, uncompressed or infinity encoding, see encodePoint
+        """
+        data = bytes(data)
+        if (data == b"\x00"):
+            return None,None
+        p = self.p
+        size = (p.bit_length()+7)//8
+        assert len(data) > 0 and data[0] in (2,3,4),"unknown SEC1 point encoding"
+        if (data[0] == 4):
+            assert len(data) == 1+2*size,"uncompressed points are "+str(1+2*size)+" bytes on this curve"
+            x = int.from_bytes(data[1:1+size],"big")
+            y = int.from_bytes(data[1+size:],"big")
+            assert x < p and y < p and self.isElem(x,y),"not a point on the curve"
+            return x,y
+        assert len(data) == 1+size,"compressed points are "+str(1+size)+" bytes on this curve"
+        x = int.from_bytes(data[1:],"big")
+        assert x < p,"not a point on the curve"
+        y = self._sqrtContext().sqrt(self._y2Value(x))
+        assert y != None,"not a point on the curve"
+        if ((y & 1) != (data[0] & 1)):
+            assert y != 0,"not a point on the curve"
+            y = p-y
+        return x,y
+
+    def encodePoints(self, points:list[tuple[int,int] | tuple[None,None]] | np.ndarray, compressed:bool = True, out=None) -> bytes | int:
+        """
+        Return the SEC1 encodings of many points concatenated into one buffer of fixed size records.
+
+            Parameters:
+                    points : The points, as a list of (x,y) tuples or an (N,2) integer NumPy array
+                    compressed : Use 1+size byte compressed records instead of 1+2*size byte uncompressed ones
+                    out : A writable buffer (bytearray, memoryview, uint8 NumPy array) to write into instead, the number of bytes written is returned
+
+            Details:
+                    Records are laid out as in encodePoint, the point at infinity is a 00 byte padded with zeros to the record size.\n
+                    The points are not validated. An integer array with p < 2^63 is encoded by NumPy without any per-point Python objects,\n
+                    other arrays go through Python integers like lists do.
+        """
+        p = self.p
+        size = (p.bit_length()+7)//8
+        record = 1+size if compressed else 1+2*size
+        np = sys.modules.get("numpy")
+        if (np != None and isinstance(points,np.ndarray) and not (p < (1<<63) and points.dtype.kind in "iu")):
+            points = points.reshape(-1,2).tolist()
+        if (np != None and isinstance(points,np.ndarray)):
+            points = points.reshape(-1,2).astype(np.int64)
+            rows = np.empty((len(points),record),dtype=np.uint8)
+            coordinates = points.astype(">u8").view(np.uint8).reshape(-1,2,8)[:,:,8-size:]
+            if (compressed):
+                rows[:,0] = 2 + (points[:,1] & 1)
+                rows[:,1:] = coordinates[:,0]
+            else:
+                rows[:,0] = 4
+                rows[:,1:] = coordinates.reshape(-1,2*size)
+            encoded = rows.reshape(-1)
+        else:
+            parts = []
+            padding = bytes(record-1)
+            for (x,y) in points:
+                if (x == None):
+                    parts.append(b"\x00")
+                    parts.append(padding)
+                elif (compressed):
+                    parts.append(bytes((2+(y & 1),)))
+                    parts.append(x.to_bytes(size,"big"))
+                else:
+                    parts.append(b"\x04")
+                    parts.append(x.to_bytes(size,"big"))
+                    parts.append(y.to_bytes(size,"big"))
+            encoded = b"".join(parts)
+        if (out == None):
+            return bytes(encoded)
+        view = memoryview(out).cast("B")
+        assert len(view) >= len(encoded),"out is too small for the encoded points"
+        view[:len(encoded)] = memoryview(encoded).cast("B")
+        return len(encoded)
+
+    def decodePoints(self, data, compressed:bool = True, asArray:bool = False) -> list[tuple[int,int] | tuple[None,None]] | np.ndarray:
+        """
+        Return the points decoded from a buffer of fixed size SEC1 records, checking that every point lies on the curve.
+
+            Parameters:
+                    data : The records as bytes, bytearray, memoryview or a uint8 NumPy array, see encodePoints
+                    compressed : Whether the records are compressed or uncompressed
+                    asArray : Return an (N,2) NumPy array instead of a list, int64 when p < 2^63, the point at infinity is not allowed
+
+            Details:
+                    Headers, padding and coordinate ranges are checked over the whole buffer at once.\n
+                    Below 2^41 the coordinates are unpacked, square rooted and validated as int64 arrays with one shared SqrtContext.\n
+                    Above that every x is read straight out of the buffer and square rooted with a single exponentiation,\n
+                    which also checks that x is the x coordinate of a point on the curve.
+        """
+        import numpy as np
+        p = self.p
+        size = (p.bit_length()+7)//8
+        record = 1+size if compressed else 1+2*size
+        rows = np.frombuffer(data,dtype=np.uint8)
+        assert rows.size % record == 0,"the buffer is not a whole number of "+str(record)+" byte records"
+        rows = rows.reshape(-1,record)
+        headers = rows[:,0]
+        infinity = headers == 0
+        validHeader = ((headers == 2) | (headers == 3)) if compressed else (headers == 4)
+        bad = ~(validHeader | (infinity & ~rows[:,1:].any(axis=1)))
+        assert not bad.any(),"record "+str(int(np.argmax(bad)))+" is not a valid SEC1 encoding"
+        assert not (asArray and infinity.any()),"the point at infinity cannot be stored in an array"
+        if (2 < p < _STREAMING_MAX_P):
+            shifts = np.arange(8*(size-1),-1,-8,dtype=np.int64)
+            xs = (rows[:,1:1+size].astype(np.int64) << shifts).sum(axis=1)
+            xs[infinity] = 0
+            xr = xs %p
+            y2 = (_mulModArray(_mulModArray(xr,xr,p),xr,p) + _mulModArray(xr,self.a%p,p) + self.b%p) %p
+            if (compressed):
+                ys,isResidue = _sqrtModPrimeArray(y2,p)
+                flip = (ys & 1) != (headers & 1)
+                valid = (xs < p) & isResidue & ~(flip & (ys == 0))
+                ys = np.where(flip,(p-ys) %p,ys)
+            else:
+                ys = (rows[:,1+size:].astype(np.int64) << shifts).sum(axis=1)
+                ys[infinity] = 0
+                valid = (xs < p) & (ys < p) & (_mulModArray(ys %p,ys %p,p) == y2)
+            bad = ~(valid | infinity)
+            assert not bad.any(),"record "+str(int(np.argmax(bad)))+" is not a point on the curve"
+            if (asArray):
+                return np.stack((xs,ys),axis=1)
+            points = list(zip(xs.tolist(),ys.tolist()))
+            for i in np.nonzero(infinity)[0].tolist():
+                points[i] = (None,None)
+            return points
+        view = memoryview(rows.reshape(-1))
+        a = self.a %p
+        b = self.b %p
+        sqrt = self._sqrtContext().sqrt
+        fromBytes = int.from_bytes
+        points = []
+        for i,offset in enumerate(range(0,len(view),record)):
+            header = view[offset]
+            if (header == 0):
+                points.append((None,None))
+                continue
+            x = fromBytes(view[offset+1:offset+1+size],"big")
+            if (compressed):
+                y = sqrt((x*x*x + a*x + b) %p) if x < p else None
+                assert y != None,"record "+str(i)+" is not a point on the curve"
+                if ((y & 1) != (header & 1)):
+                    assert y != 0,"record "+str(i)+" is not a point on the curve"
+                    y = p-y
+            else:
+                y = fromBytes(view[offset+1+size:offset+record],"big")
+                assert x < p and y < p and (y*y - x*x*x - a*x - b) %p == 0,"record "+str(i)+" is not a point on the curve"
+            points.append((x,y))
+        if (asArray):
+            return np.array(points,dtype=np.int64 if p < (1<<63) else object).reshape(-1,2)
+        return points
+
+    def groupCardinality(self, method:str = "auto") -> int:
+        """
+        Return the number of elements in the curve including the point at infinity.
+
+            Parameters:
+                    method : "enumerate", "bsgs", "schoof" or "auto" (default), see PointCounting.countPoints
+
+            Detail:
+                    "auto" picks the strategy by the size of p, the result is cached on the curve.
+        """
+        cardinality = self._cachedCardinality()
+        if (cardinality != None):
+            return cardinality
+        from PointCounting import countPoints
+        cardinality = countPoints(self,method)
+        self._cardinality = ((self.a,self.b,self.p),cardinality)
+        return cardinality
+
+    def _cachedCardinality(self) -> int | None:
+        if (self._cardinality != None and self._cardinality[0] == (self.a,self.b,self.p)):
+            return self._cardinality[1]
+        return None
+
+    def pointOrder(self, x:int | None, y:int | None, groupOrder:int | None = None) -> int:
+        """
+        Return the order of the point (x,y), the smallest n > 0 with n*(x,y) = (None,None).
+
+            Parameters:
+                    x : The x coordinate
+                    y : The y coordinate
+                    groupOrder : Any known multiple of the order, usually the number of points on the curve
+
+            Detail:
+                    By Lagrange's theorem the order of (x,y) divides the group order N.\n
+                    For each prime factor q of N, N is divided by q while (N/q)*(x,y) is still the point at infinity.\n
+                    If groupOrder is not given the cached group order is used.\n
+                    If there is none, for mid sized p a multiple of the order is found in the Hasse interval with baby-step giant-step,\n
+                    otherwise the group order is computed with groupCardinality.\n
+                    Orders and the factorizations of the group order are kept in the curve's cache.
+        """
+        assert self.isElem(x,y),"must be a point on the curve"
+        if (x==None and y==None):
+            return 1
+        order = self.cache.get(("order",x,y))
+        if (order != None):
+            return order
+        if (groupOrder == None):
+            groupOrder = self._cachedCardinality()
+        if (groupOrder == None):
+            import PointCounting
+            if (PointCounting._ENUMERATION_MAX_P <= self.p < PointCounting._BSGS_MAX_P and PointCounting._isNonSingular(self)):
+                groupOrder = PointCounting.bsgsOrderMultiple(self,x,y)
+            else:
+                groupOrder = self.groupCardinality()
+        order = groupOrder
+        for q,e in self._factorization(groupOrder).items():
+            for i in range(e):
+                if (self._pointMultiplicationUnchecked(x,y,order//q) != (None,None)):
+                    break
+                order = order//q
+        self.cache.put(("order",x,y),order)
+        return order
+
+    def _factorization(self, n:int) -> dict[int,int]:
+        factors = self.cache.get(("factors",n))
+        if (factors == None):
+            import sympy.ntheory as nt
+            factors = nt.factorint(n)
+            self.cache.put(("factors",n),factors)
+        return factors
 
     def subgroupCardinality(self, x:int | None, y:int | None) -> int:
         """
@@ -258,7 +1184,7 @@ class FiniteFieldEllipticCurve:
                     y : The y coordinate of the generator 
         
         """
-        return len(self.generatePointsFromGenerator(x,y))
+        return self.pointOrder(x,y)
 
     def isGenerator(self, x:int | None, y:int | None) -> bool:
         """
@@ -269,7 +1195,19 @@ class FiniteFieldEllipticCurve:
                     y : The y coordinate 
         
         """
-        return self.groupCardinality() == self.subgroupCardinality(x,y)
+        order = self.groupCardinality()
+        return self.pointOrder(x,y,order) == order
+
+    def generators(self) -> list[tuple[int,int]]:
+        """
+        Return all points that generate the whole curve, in the order of generatePoints().
+
+            Detail:
+                    The group order is counted and factored once and every point costs about one multiplication per prime factor,\n
+                    the orders found are kept in the curve's cache for later calls to pointOrder, isGenerator and cofactor.
+        """
+        order = self.groupCardinality()
+        return [(x,y) for (x,y) in self.generatePoints() if x != None and self.pointOrder(x,y,order) == order]
 
     def cofactor(self, gx:int | None, gy:int | None) -> int:
         """
@@ -281,10 +1219,758 @@ class FiniteFieldEllipticCurve:
         
         """        
         order = self.groupCardinality()
-        suborder = self.subgroupCardinality(gx,gy)
+        suborder = self.pointOrder(gx,gy,order)
         cofactor = (order//suborder)
         return cofactor
 
+class Point:
+    """
+    A class to represent a point on an elliptic curve over a finite field.
+
+    ...
+
+    Attributes
+    ----------
+    curve : FiniteFieldEllipticCurve
+        the curve the point lies on
+    x : int | None
+        x coordinate, None for the point at infinity
+    y : int | None
+        y coordinate, None for the point at infinity
+
+    Methods
+    -------
+    isInfinity(self):
+        Determine if the point is the point at infinity.
+
+    toTuple(self):
+        Return the point as an (x,y) tuple.
+
+    compress(self):
+        Return the compression of the point (x,parity(y)).
+
+    decompress(cls, curve, x, ybit):
+        Return the Point decoded from its compression.
+
+    toBytes(self, compressed):
+        Return the SEC1 encoding of the point.
+
+    fromBytes(cls, curve, data):
+        Return the Point decoded from its SEC1 encoding.
+    """
+
+    __slots__ = ("curve","x","y")
+
+    def __init__(self, curve:FiniteFieldEllipticCurve, x:int, y:int):
+        """
+        Inits a point (x,y) on the curve. The point is validated here once, arithmetic on Points skips the checks.\n
+        Use curve.infinity for the point at infinity.
+        """
+        assert isinstance(x,int) and isinstance(y,int) and curve.isElem(x,y),str(x)+","+str(y)+" is not a point on the curve"
+        self.curve = curve
+        self.x = x %curve.p
+        self.y = y %curve.p
+
+    @classmethod
+    def _unchecked(cls, curve:FiniteFieldEllipticCurve, x:int | None, y:int | None) -> "Point":
+        if (x==None and y==None and hasattr(curve,"infinity")):
+            return curve.infinity
+        point = cls.__new__(cls)
+        point.curve = curve
+        point.x = x
+        point.y = y
+        return point
+
+    @classmethod
+    def decompress(cls, curve:FiniteFieldEllipticCurve, x:int, ybit:int) -> "Point":
+        """
+        Return the Point decoded from the compression (x,parity(y)), checking that x is the x coordinate of a point on the curve.
+
+            Parameters:
+                    curve : The curve the point lies on
+                    x : The x coordinate
+                    ybit : The parity of the y coordinate
+        """
+        x,y = curve.pointDecompression(x,ybit)
+        assert (y*y - curve._y2Value(x)) %curve.p == 0,str(x)+" is not the x coordinate of a point on the curve"
+        return cls._unchecked(curve,x,y)
+
+    @classmethod
+    def fromBytes(cls, curve:FiniteFieldEllipticCurve, data:bytes) -> "Point":
+        """
+        Return the Point decoded from its SEC1 encoding, checking that it lies on the curve.
+
+            Parameters:
+                    curve : The curve the point lies on
+                    data : The compressed, uncompressed or infinity encoding
+        """
+        x,y = curve.decodePoint(data)
+        if (x == None):
+            return curve.infinity
+        return cls._unchecked(curve,x,y)
+
+    def toBytes(self, compressed:bool = True) -> bytes:
+        """Return the SEC1 encoding of the point, compressed by default"""
+        if (self.x == None):
+            return b"\x00"
+        size = (self.curve.p.bit_length()+7)//8
+        if (compressed):
+            return bytes((2+(self.y & 1),)) + self.x.to_bytes(size,"big")
+        return b"\x04" + self.x.to_bytes(size,"big") + self.y.to_bytes(size,"big")
+
+    def isInfinity(self) -> bool:
+        """Return whether the point is the point at infinity"""
+        return self.x == None
+
+    def toTuple(self) -> tuple[int,int] | tuple[None,None]:
+        """Return the point as an (x,y) tuple, (None,None) for the point at infinity"""
+        return self.x,self.y
+
+    def compress(self) -> tuple[int,int]:
+        """Return the compression of the point (x,parity(y))"""
+        assert self.x != None,"cannot compress the point at infinity"
+        return self.x,(self.y%2)
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __eq__(self, other) -> bool:
+        if (isinstance(other,Point)):
+            return self.x == other.x and self.y == other.y and (self.curve is other.curve or
+                   (self.curve.a-other.curve.a)%self.curve.p == 0 and (self.curve.b-other.curve.b)%self.curve.p == 0 and self.curve.p == other.curve.p)
+        if (isinstance(other,tuple)):
+            return (self.x,self.y) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.x,self.y))
+
+    def __repr__(self) -> str:
+        return "Point("+str(self.x)+","+str(self.y)+")"
+
+    def __neg__(self) -> "Point":
+        if (self.x == None):
+            return self
+        return Point._unchecked(self.curve,self.x,(-self.y)%self.curve.p)
+
+    def __add__(self, other:"Point") -> "Point":
+        if (not isinstance(other,Point)):
+            return NotImplemented
+        assert other.curve is self.curve,"points must be on the same curve"
+        return Point._unchecked(self.curve,*self.curve._pointAdditionUnchecked(self.x,self.y,other.x,other.y))
+
+    def __sub__(self, other:"Point") -> "Point":
+        if (not isinstance(other,Point)):
+            return NotImplemented
+        return self + (-other)
+
+    def __mul__(self, s:int) -> "Point":
+        if (not isinstance(s,int)):
+            return NotImplemented
+        if (s < 0):
+            return (-self)*(-s)
+        return Point._unchecked(self.curve,*self.curve._pointMultiplicationUnchecked(self.x,self.y,s))
+
+    __rmul__ = __mul__
+
+class FixedBaseMultiplier:
+    """
+    A class to represent a precomputed fixed-window table for multiplication of a fixed point on a curve.
+
+    ...
+
+    Attributes
+    ----------
+    curve : FiniteFieldEllipticCurve
+        the curve the point lies on
+    gx : int
+        x coordinate of the fixed point
+    gy : int
+        y coordinate of the fixed point
+    window : int
+        number of scalar bits consumed per table row
+    bits : int
+        largest scalar bit length covered by the table
+    table : list[list[tuple[int,int] | tuple[None,None]]]
+        table[i][j-1] = j*2^(window*i)*(gx,gy) for 1 <= j < 2^window
+
+    Methods
+    -------
+    multiply(self, s):
+        Return the multiplication of the fixed point by a scalar s.
+
+    toBytes(self):
+        Return the table serialized as bytes.
+
+    fromBytes(cls, curve, data):
+        Return a FixedBaseMultiplier loaded from bytes produced by toBytes.
+    """
+
+    _MAGIC = b"FBM1"
+
+    def __init__(self, curve:FiniteFieldEllipticCurve, gx:int, gy:int, window:int = 4, bits:int | None = None, table:list | None = None):
+        """
+        Inits the table for the point (gx,gy) on the curve.\n
+        Building the table costs about bits doublings and bits/window * 2^window additions, it is only done once.
+        """
+        assert isinstance(gx,int) and isinstance(gy,int) and curve.isElem(gx,gy),"must be a non-infinity point on the curve"
+        assert isinstance(window,int) and window>=1,"window must be a positive integer"
+        self.curve = curve
+        self.gx = gx
+        self.gy = gy
+        self.window = window
+        self.bits = bits if bits is not None else curve.p.bit_length()+1
+        self.table = table if table is not None else self._buildTable()
+
+    def _buildTable(self) -> list[list[tuple[int,int] | tuple[None,None]]]:
+        curve = self.curve
+        rows = -(-self.bits//self.window)
+        table = []
+        BX,BY,BZ = self.gx,self.gy,1
+        for i in range(rows):
+            row = [(BX,BY,BZ)]
+            X,Y,Z = BX,BY,BZ
+            for j in range(2,1<<self.window):
+                X,Y,Z = curve._jacobianAdd(X,Y,Z,BX,BY,BZ)
+                row.append((X,Y,Z))
+            table.append(curve.batchNormalize(row))
+            for k in range(self.window):
+                BX,BY,BZ = curve._jacobianDouble(BX,BY,BZ)
+        return table
+
+    def multiply(self, s:int) -> tuple[int,int] | tuple[None,None]:
+        """
+        Return the multiplication of the fixed point by a non-negative integer scalar.
+
+            Parameters:
+                    s : The scalar
+
+            Detail:
+                    The scalar is split into window sized digits s_i, then s*G = sum of table[i][s_i-1].\n
+                    No doublings are needed, only one mixed addition per non-zero digit and a single final inversion.\n
+                    Scalars longer than the table covers fall back to curve.pointMultiplication.
+        """
+        assert isinstance(s,int) and s>=0,"can only multiply by non negative integers"
+        if (s.bit_length() > self.bits):
+            return self.curve.pointMultiplication(self.gx,self.gy,s)
+        curve = self.curve
+        mask = (1<<self.window)-1
+        X,Y,Z = 1,1,0
+        i = 0
+        while (s > 0):
+            digit = s & mask
+            if (digit):
+                tx,ty = self.table[i][digit-1]
+                if (tx != None):
+                    X,Y,Z = curve._jacobianMixedAdd(X,Y,Z,tx,ty)
+            s = s>>self.window
+            i = i+1
+        return curve._fromJacobian(X,Y,Z)
+
+    def toBytes(self) -> bytes:
+        """
+        Return the table serialized as bytes, so that other processes can load it with fromBytes without rebuilding it.\n
+        Every coordinate is stored big-endian in a fixed width, every point is prefixed with a flag byte (0 = infinity).
+        """
+        p = self.curve.p
+        size = (p.bit_length()+7)//8
+        out = bytearray(self._MAGIC)
+        out += struct.pack(">III",size,self.window,self.bits)
+        for v in (p,self.curve.a%p,self.curve.b%p,self.gx,self.gy):
+            out += v.to_bytes(size,"big")
+        for row in self.table:
+            for (x,y) in row:
+                if (x == None):
+                    out += bytes(1+2*size)
+                else:
+                    out += b"\x01" + x.to_bytes(size,"big") + y.to_bytes(size,"big")
+        return bytes(out)
+
+    @classmethod
+    def fromBytes(cls, curve:FiniteFieldEllipticCurve, data:bytes) -> "FixedBaseMultiplier":
+        """
+        Return a FixedBaseMultiplier loaded from the output of toBytes.
+
+            Parameters:
+                    curve : The curve the table was built for
+                    data : The serialized table
+
+            Details:
+                    The data is checked before it is used: its length, that (gx,gy) and every table entry lie on the curve\n
+                    and that the entries chain, table[0][0] = (gx,gy), table[i][j] = table[i][j-1] + table[i][0] and\n
+                    table[i][0] = table[i-1][-1] + table[i-1][0] = 2^window*table[i-1][0]. Each link is checked without inversions,\n
+                    by testing whether the three points are collinear. A truncated or corrupted table raises an AssertionError.
+        """
+        data = memoryview(data)
+        assert len(data) >= 16 and bytes(data[:4]) == cls._MAGIC,"not a serialized FixedBaseMultiplier"
+        size,window,bits = struct.unpack(">III",data[4:16])
+        assert window >= 1 and bits >= 1 and size == (curve.p.bit_length()+7)//8,"corrupted FixedBaseMultiplier header"
+        rows = -(-bits//window)
+        assert len(data) == 16 + 5*size + rows*((1<<window)-1)*(1+2*size),"truncated or oversized FixedBaseMultiplier data"
+        offset = 16
+        header = []
+        for i in range(5):
+            header.append(int.from_bytes(data[offset:offset+size],"big"))
+            offset = offset+size
+        p,a,b,gx,gy = header
+        assert (p,a,b) == (curve.p,curve.a%curve.p,curve.b%curve.p),"table was built for a different curve"
+        assert gx < p and gy < p and curve.isElem(gx,gy),"the fixed point is not on the curve"
+        table = []
+        for i in range(rows):
+            row = []
+            for j in range(1,1<<window):
+                flag = data[offset]
+                if (flag == 0):
+                    row.append((None,None))
+                else:
+                    x = int.from_bytes(data[offset+1:offset+1+size],"big")
+                    y = int.from_bytes(data[offset+1+size:offset+1+2*size],"big")
+                    assert flag == 1 and x < p and y < p and curve.isElem(x,y),"table entry is not a point on the curve"
+                    row.append((x,y))
+                offset = offset+1+2*size
+            table.append(row)
+        assert table[0][0] == (gx,gy),"the table does not match the fixed point"
+        for i in range(rows):
+            base = table[i][0]
+            if (i > 0):
+                assert _isSum(curve,table[i-1][-1],table[i-1][0],base),"table row "+str(i)+" does not follow the previous row"
+            for j in range(1,len(table[i])):
+                assert _isSum(curve,table[i][j-1],base,table[i][j]),"table entry "+str(i)+","+str(j)+" is not a multiple of its row"
+        return cls(curve,gx,gy,window,bits,table)
+
+def _isSum(curve:FiniteFieldEllipticCurve, P:tuple, Q:tuple, R:tuple) -> bool:
+    """
+    Return whether R = P + Q for points on the curve.\n
+    Without inversions -R is checked to lie on the line through P and Q, or on the tangent at P if P = Q,\n
+    the cases where that does not decide it, such as R = -P or the point at infinity, are added up explicitly.
+    """
+    p = curve.p
+    (x1,y1),(x2,y2),(x3,y3) = P,Q,R
+    if (x1 == None or x2 == None or x3 == None or x3 == x1 or x3 == x2):
+        return curve._pointAdditionUnchecked(x1,y1,x2,y2) == R
+    if (x1 != x2):
+        return ((y2-y1)*(x3-x1) + (y3+y1)*(x2-x1)) %p == 0
+    if (y1 != y2 or y1 == 0):
+        return False
+    return ((3*x1*x1 + curve.a)*(x3-x1) + 2*y1*(y3+y1)) %p == 0
+
+class GLVEndomorphism:
+    """
+    A class to represent the endomorphism phi(x,y) = (beta*x,y) of a curve y^2 = x^3 + b over F_p with p = 1 (mod 3).
+
+    ...
+
+    beta is a cube root of unity mod p and phi acts on a group of prime order n as multiplication by lambda,
+    a cube root of unity mod n. Any scalar k splits into k = k1 + k2*lambda (mod n) with |k1|,|k2| about sqrt(n),
+    so k*P = k1*P + k2*phi(P) can be computed with half as many doublings (Gallant, Lambert and Vanstone).
+
+    Attributes
+    ----------
+    curve : FiniteFieldEllipticCurve
+        the curve the endomorphism acts on
+    n : int
+        the prime group order
+    beta : int
+        the cube root of unity mod p
+    lam : int
+        the cube root of unity mod n with phi(P) = lam*P
+    basis : tuple[int,int,int,int]
+        the reduced lattice basis (a1,b1,a2,b2) of {(x,y) : x + y*lam = 0 (mod n)}
+
+    Methods
+    -------
+    fromCurve(cls, curve, groupOrder):
+        Return the endomorphism of the curve, or None if it has none that can be used.
+
+    decompose(self, k):
+        Return (k1,k2) with k = k1 + k2*lam (mod n) and both about half the length of n.
+
+    apply(self, x, y):
+        Return phi(x,y) = (beta*x,y).
+
+    multiply(self, x, y, s, window):
+        Return the multiplication of the point (x,y) by a scalar s.
+    """
+
+    def __init__(self, curve:FiniteFieldEllipticCurve, n:int, beta:int, lam:int):
+        """
+        Inits the endomorphism with matching beta and lam and reduces the lattice basis used by decompose.\n
+        The pair is not checked here, use fromCurve to find and check it.
+        """
+        self.curve = curve
+        self.n = n
+        self.beta = beta
+        self.lam = lam
+        self.basis = self._reducedBasis()
+
+    def _reducedBasis(self) -> tuple[int,int,int,int]:
+        # extended Euclid on (n,lam) stopped at the remainder below sqrt(n), Guide to Elliptic Curve Cryptography algorithm 3.74
+        n = self.n
+        r0,t0 = n,0
+        r1,t1 = self.lam,1
+        while (r1*r1 >= n):
+            q = r0//r1
+            r0,r1 = r1,r0-q*r1
+            t0,t1 = t1,t0-q*t1
+        q = r0//r1
+        r2,t2 = r0-q*r1,t0-q*t1
+        if (r0*r0 + t0*t0 <= r2*r2 + t2*t2):
+            return r1,-t1,r0,-t0
+        return r1,-t1,r2,-t2
+
+    @classmethod
+    def fromCurve(cls, curve:FiniteFieldEllipticCurve, groupOrder:int) -> "GLVEndomorphism | None":
+        """
+        Return the endomorphism of a curve y^2 = x^3 + b with p = 1 (mod 3) and prime group order, or None otherwise.
+
+            Parameters:
+                    curve : The curve
+                    groupOrder : The number of points on the curve
+
+            Details:
+                    beta is a primitive cube root of unity mod p and lam = (-1 + sqrt(-3))/2 mod n.\n
+                    Each lam matches only one of beta and beta^2, so lam*P is computed once for a point P to choose between them.
+        """
+        p = curve.p
+        n = groupOrder
+        if (curve.a %p != 0 or p%3 != 1 or curve.b %p == 0):
+            return None
+        if (n < 7 or n == p or n%3 != 1 or not _isProbablePrime(n)):
+            return None
+        g = 2
+        while (curve.field.pow(g,(p-1)//3,p) == 1):
+            g = g+1
+        beta = curve.field.pow(g,(p-1)//3,p)
+        root = FieldBackends.sqrtContext(n,curve.field).sqrt(n-3)
+        if (root == None):
+            return None
+        lam = ((root-1)*pow(2,-1,n)) %n
+        x = 0
+        y = curve._sqrtContext().sqrt(curve._y2Value(x))
+        while (not y):
+            x = x+1
+            y = curve._sqrtContext().sqrt(curve._y2Value(x))
+        lamP = curve._fromJacobian(*curve._wnafPointMultiplication(x,y,lam,4))
+        if (lamP == ((beta*x) %p,y)):
+            return cls(curve,n,beta,lam)
+        beta = (beta*beta) %p
+        if (lamP == ((beta*x) %p,y)):
+            return cls(curve,n,beta,lam)
+        return None
+
+    def decompose(self, k:int) -> tuple[int,int]:
+        """
+        Return (k1,k2) with k = k1 + k2*lam (mod n), where k1 and k2 may be negative and are about sqrt(n) in size.
+
+            Parameters:
+                    k : The scalar
+
+            Details:
+                    (k,0) is written in the reduced basis with rounded coefficients c1,c2 and (k1,k2) is what is left over,\n
+                    a short vector since the basis is.
+        """
+        n = self.n
+        a1,b1,a2,b2 = self.basis
+        k = k %n
+        c1 = (2*b2*k + n)//(2*n)
+        c2 = (-2*b1*k + n)//(2*n)
+        return k - c1*a1 - c2*a2, -c1*b1 - c2*b2
+
+    def apply(self, x:int | None, y:int | None) -> tuple[int,int] | tuple[None,None]:
+        """Return phi(x,y) = (beta*x,y), which equals lam*(x,y)"""
+        if (x == None):
+            return None,None
+        return (self.beta*x) %self.curve.p,y
+
+    def _splitTerms(self, terms:list[tuple[tuple[int,int],int]]) -> list[tuple[tuple[int,int],int]]:
+        # k*P -> k1*P + k2*phi(P) with the signs moved onto the points, for the multi-scalar methods
+        p = self.curve.p
+        split = []
+        for (x,y),s in terms:
+            k1,k2 = self.decompose(s)
+            for (tx,ty),k in (((x,y),k1),(self.apply(x,y),k2)):
+                if (k > 0):
+                    split.append(((tx,ty),k))
+                elif (k < 0):
+                    split.append(((tx,(-ty) %p),-k))
+        return split
+
+    def _jacobianMultiply(self, x:int, y:int, s:int, w:int) -> tuple[int,int,int]:
+        curve = self.curve
+        p = curve.p
+        k1,k2 = self.decompose(s)
+        table = curve._wnafTable(x,y,w)
+        endoTable = [self.apply(tx,ty) for (tx,ty) in table]
+        terms = [(table,_wnaf(abs(k1),w),-1 if k1 < 0 else 1),
+                 (endoTable,_wnaf(abs(k2),w),-1 if k2 < 0 else 1)]
+        X,Y,Z = 1,1,0
+        for i in range(max(len(terms[0][1]),len(terms[1][1]))-1,-1,-1):
+            X,Y,Z = curve._jacobianDouble(X,Y,Z)
+            for table,d,sign in terms:
+                if (i >= len(d) or d[i] == 0):
+                    continue
+                digit = d[i]*sign
+                tx,ty = table[abs(digit)>>1]
+                if (tx == None):
+                    continue
+                if (digit < 0):
+                    ty = (-ty)%p
+                X,Y,Z = curve._jacobianMixedAdd(X,Y,Z,tx,ty)
+        return X,Y,Z
+
+    def multiply(self, x:int | None, y:int | None, s:int, window:int = 4) -> tuple[int,int] | tuple[None,None]:
+        """
+        Return the multiplication of a point on the curve by a non-negative integer scalar.
+
+            Parameters:
+                    x : The x coordinate
+                    y : The y coordinate
+                    s : The scalar
+                    window : The width w of the NAF of k1 and k2
+
+            Details:
+                    k1*P + k2*phi(P) is evaluated as one joint width-w NAF double-and-add, the table of phi(P) is the\n
+                    table of P with every x multiplied by beta, so only about log2(n)/2 doublings are needed.
+        """
+        assert isinstance(s,int) and s>=0,"can only multiply by non negative integers"
+        assert self.curve.isElem(x,y),"must be a point on the curve"
+        assert isinstance(window,int) and window>=2,"window must be an integer of at least 2"
+        if (x == None or s%self.n == 0):
+            return None,None
+        return self.curve._fromJacobian(*self._jacobianMultiply(x,y,s,window))
+
+
+def _mulModArray(a:np.ndarray, b:np.ndarray | int, p:int) -> np.ndarray:
+    if (p < _VECTORIZED_MAX_P):
+        return (a*b) %p
+    return (((a>>21)*((b<<21) %p)) %p + ((a & 0x1FFFFF)*b) %p) %p
+
+def _powModArray(a:np.ndarray, e:int, p:int) -> np.ndarray:
+    import numpy as np
+    result = np.ones_like(a)
+    for bit in bin(e)[2:]:
+        result = _mulModArray(result,result,p)
+        if (bit == '1'):
+            result = _mulModArray(result,a,p)
+    return result
+
+def _sqrtModPrimeArray(n:np.ndarray, p:int) -> tuple[np.ndarray,np.ndarray]:
+    """
+    Return a square root of every element of n mod an odd prime p < 2^41, and a mask of which elements are quadratic residues.\n
+    Follows the SqrtContext of p: a single exponentiation when p = 3 (mod 4) or p = 5 (mod 8),\n
+    otherwise Tonelli-Shanks elementwise with the cached non-residue, the loop only touching the elements that still need work.
+    """
+    import numpy as np
+    context = FieldBackends.sqrtContext(p)
+    if (context.method in ("exponent","atkin")):
+        if (context.method == "exponent"):
+            R = _powModArray(n,(p+1)>>2,p)
+        else:
+            n2 = (2*n) %p
+            b = _powModArray(n2,(p-5)>>3,p)
+            i = _mulModArray(_mulModArray(n2,b,p),b,p)
+            R = _mulModArray(_mulModArray(n,b,p),(i-1) %p,p)
+        return R,_mulModArray(R,R,p) == n %p
+    Q = context.Q
+    S = context.S
+    z = context.nonResidue
+    t = _powModArray(n,Q,p)
+    R = _powModArray(n,(Q+1)>>1,p)
+    check = t
+    for i in range(S-1):
+        check = _mulModArray(check,check,p)
+    isResidue = (check == 1) | (n == 0)
+    R[n == 0] = 0
+    idx = np.nonzero(isResidue & (t != 1) & (n != 0))[0]
+    t = t[idx]
+    c = np.full(len(idx),pow(z,Q,p),dtype=np.int64)
+    M = np.full(len(idx),S,dtype=np.int64)
+    while (len(idx) > 0):
+        i = np.zeros(len(idx),dtype=np.int64)
+        tt = t
+        for k in range(1,S):
+            tt = _mulModArray(tt,tt,p)
+            i[(i == 0) & (tt == 1)] = k
+        b = c
+        e = M-i-1
+        for k in range(int(e.max())):
+            sel = e > k
+            b = np.where(sel,_mulModArray(b,b,p),b)
+        b2 = _mulModArray(b,b,p)
+        R[idx] = _mulModArray(R[idx],b,p)
+        M = i
+        c = b2
+        t = _mulModArray(t,b2,p)
+        active = t != 1
+        idx,t,c,M = idx[active],t[active],c[active],M[active]
+    return R,isResidue
+
+def _pointsInRange(a:int, b:int, p:int, start:int, stop:int) -> np.ndarray:
+    import numpy as np
+    xs = np.arange(start,stop,dtype=np.int64)
+    y2 = (_mulModArray(_mulModArray(xs,xs,p),xs,p) + _mulModArray(xs,a%p,p) + b%p) %p
+    ys,isResidue = _sqrtModPrimeArray(y2,p)
+    xs = xs[isResidue]
+    ys = np.minimum(ys[isResidue],p-ys[isResidue])
+    nonZero = ys != 0
+    counts = 1 + nonZero
+    offsets = np.cumsum(counts) - counts
+    points = np.empty((int(counts.sum()),2),dtype=np.int64)
+    points[offsets,0] = xs
+    points[offsets,1] = ys
+    points[offsets[nonZero]+1,0] = xs[nonZero]
+    points[offsets[nonZero]+1,1] = p-ys[nonZero]
+    return points
+
+def _writePointShard(a:int, b:int, p:int, start:int, stop:int, chunk:int, path:str) -> int:
+    count = 0
+    with open(path,"wb") as f:
+        for lo in range(start,stop,chunk):
+            points = _pointsInRange(a,b,p,lo,min(lo+chunk,stop))
+            points.astype(_POINT_RECORD_DTYPE).tofile(f)
+            count = count+len(points)
+    return count
+
+def openPointTable(path:str) -> np.memmap:
+    """
+    Return the points written by FiniteFieldEllipticCurve.writePointTable as a read-only (N,2) memory-mapped uint64 array.
+
+        Parameters:
+                path : The file written by writePointTable
+    """
+    import numpy as np
+    size = os.path.getsize(path)//(2*_POINT_RECORD_SIZE)
+    if (size == 0):
+        return np.zeros((0,2),dtype=_POINT_RECORD_DTYPE)
+    return np.memmap(path,dtype=_POINT_RECORD_DTYPE,mode="r",shape=(size,2))
+
+def _batchInverse(values:list[int], p:int, field:FieldBackends.FieldBackend | None = None) -> list[int]:
+    """
+    Return the inverses of a list of integers mod p using Montgomery's simultaneous inversion trick.\n
+    Values that are 0 (mod p) have no inverse and are returned as 0.
+    """
+    prefix = []
+    acc = 1
+    for v in values:
+        v = v %p
+        if (v != 0):
+            acc = (acc*v) %p
+        prefix.append(acc)
+    accInv = (field or FieldBackends.getBackend()).inv(acc,p)
+    inverses = [0]*len(values)
+    for i in range(len(values)-1,-1,-1):
+        v = values[i] %p
+        if (v == 0):
+            continue
+        before = prefix[i-1] if i > 0 else 1
+        inverses[i] = (accInv*before) %p
+        accInv = (accInv*v) %p
+    return inverses
+
+def _wnaf(s:int, w:int) -> list[int]:
+    """
+    Return the width-w non-adjacent form of a non-negative integer, least significant digit first.\n
+    Every non-zero digit is odd, lies in (-2^(w-1), 2^(w-1)) and is followed by at least w-1 zeros.
+    """
+    digits = []
+    mod = 1<<w
+    half = 1<<(w-1)
+    while (s > 0):
+        if (s & 1):
+            d = s & (mod-1)
+            if (d >= half):
+                d = d - mod
+            s = s - d
+        else:
+            d = 0
+        digits.append(d)
+        s = s>>1
+    return digits
+
+def _isProbablePrime(n:int) -> bool:
+    """
+    Return whether n is prime, using Miller-Rabin with the first 13 prime bases followed by a strong Lucas test.\n
+    Miller-Rabin alone is exact for n < 3.3*10^24, together with the base 2 round the Lucas test makes this\n
+    the Baillie-PSW test for larger n, which no known composite passes.
+    """
+    if (n < 2):
+        return False
+    for q in _PRIME_TEST_BASES:
+        if (n%q == 0):
+            return n == q
+    d = n-1
+    s = 0
+    while (d%2 == 0):
+        d = d>>1
+        s = s+1
+    for q in _PRIME_TEST_BASES:
+        x = pow(q,d,n)
+        if (x == 1 or x == n-1):
+            continue
+        for i in range(s-1):
+            x = (x*x) %n
+            if (x == n-1):
+                break
+        else:
+            return False
+    if (n < _MILLER_RABIN_EXACT_BOUND):
+        return True
+    return _isStrongLucasProbablePrime(n)
+
+def _jacobiSymbol(a:int, n:int) -> int:
+    """Return the Jacobi symbol (a/n) of an odd n > 0"""
+    a = a %n
+    result = 1
+    while (a != 0):
+        while (a%2 == 0):
+            a = a>>1
+            if (n%8 in (3,5)):
+                result = -result
+        a,n = n,a
+        if (a%4 == 3 and n%4 == 3):
+            result = -result
+        a = a %n
+    return result if n == 1 else 0
+
+def _isStrongLucasProbablePrime(n:int) -> bool:
+    """
+    Return whether an odd n > 2 is a strong Lucas probable prime, with the parameters P=1, Q=(1-D)/4 of Selfridge's method A:\n
+    D is the first of 5,-7,9,-11,... with Jacobi symbol (D/n) = -1.
+    """
+    r = math.isqrt(n)
+    if (r*r == n):
+        # no such D exists for a square
+        return False
+    D = 5
+    while (True):
+        j = _jacobiSymbol(D,n)
+        if (j == -1):
+            break
+        if (j == 0 and abs(D) != n):
+            return False
+        D = -D-2 if D > 0 else -D+2
+    Q = ((1-D)//4) %n
+    d = n+1
+    s = 0
+    while (d%2 == 0):
+        d = d>>1
+        s = s+1
+    def half(x:int) -> int:
+        return (x if x%2 == 0 else x+n)//2 %n
+    U,V,Qk = 1,1,Q
+    for bit in bin(d)[3:]:
+        U,V,Qk = (U*V) %n,(V*V-2*Qk) %n,(Qk*Qk) %n
+        if (bit == "1"):
+            U,V,Qk = half(U+V),half(D*U+V),(Qk*Q) %n
+    if (U == 0 or V == 0):
+        return True
+    for i in range(s-1):
+        V,Qk = (V*V-2*Qk) %n,(Qk*Qk) %n
+        if (V == 0):
+            return True
+    return False
+
 def isQuadraticResidue(p:int, a:int) -> bool:
     """
     Return whether or not an integer has a square root in the field F_p.\n
@@ -297,11 +1983,7 @@ def isQuadraticResidue(p:int, a:int) -> bool:
     if (a==0 or a==1):
         return True
     else:
-        ls = pow(a,(p-1)>>1,p)
-        if (ls==1):
-            return True
-        else:
-            return False
+        return FieldBackends.getBackend().legendre(a,p) != -1
 
 def tonelliShanks(p:int, n:int) -> int:
     """
@@ -316,39 +1998,9 @@ def tonelliShanks(p:int, n:int) -> int:
                 Implements the tonelli-shanks algorithm.\n
                 https://en.wikipedia.org/wiki/Tonelli%E2%80%93Shanks_algorithm
     """        
-    Q = p-1
-    S = 0
-    while (Q%2==0):
-        Q = Q>>1
-        S = S+1
-    Q = int(Q)
-    z= np.random.randint(2,p-2)
-    while (isQuadraticResidue(p,z)):
-        z= np.random.randint(2,p-2)
-
-    M = S
-    c = pow(z,Q,p)
-    t = pow(n,Q,p)
-    R = pow(n,(Q+1)>>1,p)
-
-    while(True):
-        if (t==0):
-            return 0
-        elif (t==1):
-            return R
-        else:
-            i=1
-            while (pow(t,2**i,p) != 1):
-                i = i+1
-                if (i==M):
-                    raise Exception("n="+str(n)+" is not a quadratic residue mod "+str(p)) 
-            b = pow(c,2**(M-i-1),p)
-            M = i %p
-            c = pow(b,2,p)
-            t = (t*(b**2)) %p
-            R = (R*b) %p
-
-def sqrtModPrime(p:int ,n:int) -> list[int]:
+    return FieldBackends.getBackend().sqrt(n,p)
+
+def sqrtModPrime(p:int ,n:int, field:FieldBackends.FieldBackend | None = None) -> list[int]:
     """
     Return both modular square roots of n under the field p. 
     i.e. Return (x,x') such that x^2 = n (mod p) and x'^2 = n (mod p).
@@ -356,9 +2008,11 @@ def sqrtModPrime(p:int ,n:int) -> list[int]:
         Parameters:
                 p : The prime that the field is in relation to
                 a : The integer to find the root of, must be a quadratic residue
+                field : The field backend to use, by default the active one
 
         Details:
-                Implements the tonelli-shanks algorithm.\n
+                Uses the cached FieldBackends.SqrtContext of p: a single exponentiation when p = 3 (mod 4) or p = 5 (mod 8),\n
+                table driven tonelli-shanks or cipolla otherwise.\n
                 https://en.wikipedia.org/wiki/Tonelli%E2%80%93Shanks_algorithm
     """ 
     assert p>=2,"p must be a prime greater than or equal to 2"
@@ -366,10 +2020,7 @@ def sqrtModPrime(p:int ,n:int) -> list[int]:
     if (p==2):
         return [n]
     else:
-        if (p%4==3):
-            r = pow(n,(p+1)>>2,p)
-        else:
-            r = tonelliShanks(p,n)
+        r = (field or FieldBackends.getBackend()).sqrt(n,p)
         if (r==0):
             return [r]
         else:
@@ -393,7 +2044,7 @@ def diffieHellmanKeyExchangeExample(curve:FiniteFieldEllipticCurve,gx:int | None
           "Alice's private key: "+str(da)+", Alice's public key: "+str(Qa)+"\n"+
           "Bob's private key: "+str(db)+", Bob's public key: "+str(Qb))
     
-    xk,yk = curve.pointMultiplication(Qa[0],Qa[1],db)
+    xk = curve.sharedSecretX(Qa[0],db)
     print("Each person calculates the product of their private key with the other's private key \nThis gives the same value for each person but is not known to other people")
     print("Shared secret is the x value of the calculated point: ",xk)
     print("Alice and Bob now have a shared secret that can be used in a symmetric key algorithm to encrypt and decrypt messages ")
@@ -402,14 +2053,87 @@ def _pointsUnzip(points: list[tuple[int,int] | tuple[None,None]]) -> tuple[list[
     points = list(map(list, zip(*points)))
     return points[0],points[1]
 
+def _densityRaster(curve:FiniteFieldEllipticCurve, bins:int, samples:int, seed:int) -> tuple[np.ndarray,bool]:
+    """
+    Return the number of points of the curve in each of bins x bins cells covering [0,p)^2, indexed [y cell, x cell],\n
+    and whether the counts are exact. For p <= 2^20 every point is counted, streamed from iterPoints one chunk at a time,\n
+    otherwise samples random x coordinates are tried and each one on the curve adds one of its two points.
+    """
+    import numpy as np
+    p = curve.p
+    counts = np.zeros(bins*bins,dtype=np.int64)
+    if (2 < p <= _PLOT_EXACT_MAX_P):
+        for chunk in curve.iterPoints():
+            cells = ((chunk[:,0]*bins)//p)*bins + (chunk[:,1]*bins)//p
+            counts += np.bincount(cells,minlength=bins*bins)
+        return counts.reshape(bins,bins).T,True
+    rng = random.Random(seed)
+    sqrt = curve._sqrtContext().sqrt
+    cells = []
+    for i in range(samples):
+        x = rng.randrange(p)
+        y = sqrt(curve._y2Value(x))
+        if (y == None):
+            continue
+        if (rng.getrandbits(1)):
+            y = (-y) %p
+        cells.append(((x*bins)//p)*bins + (y*bins)//p)
+    counts += np.bincount(np.array(cells,dtype=np.int64),minlength=bins*bins)
+    return counts.reshape(bins,bins).T,False
+
+def plotCurve(curve:FiniteFieldEllipticCurve, mode:str = "auto", resolution:int = _PLOT_RESOLUTION, subgroup:tuple[int,int] | None = None, maxTicks:int = _PLOT_MAX_TICKS, samples:int = _PLOT_SAMPLES, seed:int = 0, ax=None, show:bool = True):
+    """
+    Plot the points of a curve and return the matplotlib Axes.
+
+        Parameters:
+                curve : The curve
+                mode : "scatter" draws every point, "density" a raster of point counts, "auto" (default) scatters for p <= 2000
+                resolution : The number of raster cells along each axis in "density" mode, at most p
+                subgroup : A generator (gx,gy) whose subgroup is overlaid, only its first 2^16 multiples are drawn
+                maxTicks : The largest number of ticks on each axis
+                samples : The number of random x coordinates tried when p is too large to count every point
+                seed : The seed for those random x coordinates
+                ax : The Axes to draw into, a new 6x6 inch figure by default
+                show : Call plt.show() when done
+
+        Details:
+                "density" never holds the point list, it streams the points with iterPoints into a resolution x resolution\n
+                histogram and draws it with imshow, so drawing takes the same time for every p.\n
+                For p > 2^20 counting every point is too slow and the raster is estimated from samples random x coordinates,\n
+                which works for curves of any size. Ticks are placed by a MaxNLocator instead of one per field element.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import MaxNLocator
+    assert mode in ("auto","scatter","density"),"mode must be 'auto', 'scatter' or 'density'"
+    p = curve.p
+    if (mode == "auto"):
+        mode = "scatter" if p <= _PLOT_SCATTER_MAX_P else "density"
+    if (ax == None):
+        fig, ax = plt.subplots(1, 1)
+        fig.set_size_inches(6, 6)
+    ax.set_title(str(curve))
+    if (mode == "scatter"):
+        xs,ys = _pointsUnzip([point for point in curve.generatePoints() if point[0] != None])
+        ax.scatter(xs, ys, s=max(1,min(20,40000//p)))
+        ax.grid()
+        ax.set_xlim(-0.5, p-0.5)
+        ax.set_ylim(-0.5, p-0.5)
+    else:
+        bins = max(1,min(resolution,p))
+        counts,exact = _densityRaster(curve,bins,samples,seed)
+        image = ax.imshow(counts, origin="lower", extent=(0,float(p),0,float(p)), interpolation="nearest", aspect="equal")
+        ax.figure.colorbar(image, ax=ax, fraction=0.046, pad=0.04, label="points per cell" if exact else "sampled points per cell")
+    if (subgroup != None):
+        points = [point for point in curve.generatePointsFromGenerator(*subgroup,limit=_PLOT_MAX_SUBGROUP) if point[0] != None]
+        if (points):
+            xs,ys = _pointsUnzip(points)
+            ax.scatter([float(x) for x in xs], [float(y) for y in ys], s=8, c="red", label="<"+str(tuple(subgroup))+">")
+            ax.legend(loc="upper right")
+    ax.xaxis.set_major_locator(MaxNLocator(nbins=maxTicks, integer=True))
+    ax.yaxis.set_major_locator(MaxNLocator(nbins=maxTicks, integer=True))
+    if (show):
+        plt.show()
+    return ax
+
 def _plotCurve(curve:FiniteFieldEllipticCurve):
-    xs,ys = _pointsUnzip(curve.generatePoints())
-    fig, (ax1) = plt.subplots(1, 1)
-    fig.suptitle('y^2 = x^3 + '+str(curve.b)+ '(mod '+str(curve.p)+')')
-    fig.set_size_inches(6, 6)
-    ax1.set_xticks(range(0,curve.p))
-    ax1.set_yticks(range(0,curve.p))
-    plt.grid()
-    plt.scatter(xs, ys)
-    plt.plot()
-    plt.show()
+    plotCurve(curve)
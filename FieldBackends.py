@@ -0,0 +1,372 @@
+import random
+import time
+from collections import OrderedDict
+
+gmpy2 = None
+
+_SQRT_CONTEXT_CACHE_MAXSIZE = 64
+_sqrtContexts = OrderedDict()
+_SQRT_TABLE_WINDOW = 5
+_CIPOLLA_MIN_COST_RATIO = 10
+
+
+class FieldBackend:
+    """
+    A class to represent the arithmetic of the prime field F_p on Python integers.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        name used to select the backend with setBackend
+
+    Methods
+    -------
+    mul(self, a, b, p):
+        Return a*b mod p.
+
+    sqr(self, a, p):
+        Return a^2 mod p.
+
+    inv(self, a, p):
+        Return the inverse of a mod p.
+
+    pow(self, a, e, p):
+        Return a^e mod p.
+
+    legendre(self, a, p):
+        Return the Legendre symbol (a/p), one of -1, 0 or 1.
+
+    sqrt(self, a, p):
+        Return a square root of a mod p.
+    """
+
+    name = "python"
+
+    def mul(self, a:int, b:int, p:int) -> int:
+        return (a*b) %p
+
+    def sqr(self, a:int, p:int) -> int:
+        return (a*a) %p
+
+    def inv(self, a:int, p:int) -> int:
+        return pow(a,-1,p)
+
+    def pow(self, a:int, e:int, p:int) -> int:
+        return pow(a,e,p)
+
+    def legendre(self, a:int, p:int) -> int:
+        a = a %p
+        if (a == 0):
+            return 0
+        if (self.pow(a,(p-1)>>1,p) == 1):
+            return 1
+        return -1
+
+    def sqrt(self, a:int, p:int) -> int:
+        """
+        Return a square root of a mod a prime p, a must be a quadratic residue.
+
+            Parameters:
+                    a : The integer to find the root of
+                    p : The prime that the field is in relation to
+
+            Details:
+                    Uses the cached SqrtContext of p, see sqrtContext.
+        """
+        r = sqrtContext(p,self).sqrt(a)
+        if (r == None):
+            raise Exception("n="+str(a)+" is not a quadratic residue mod "+str(p))
+        return r
+
+
+class Gmpy2FieldBackend(FieldBackend):
+    """
+    A class to represent the arithmetic of the prime field F_p using gmpy2's mpz integers.
+
+    ...
+
+    Inputs and outputs are Python integers, only the arithmetic itself runs on mpz values,
+    so modular inversion, exponentiation and Legendre symbols are several times faster at 256 bits and above.
+    A single multiplication is cheaper than the conversion to and from mpz, so mul and sqr stay on Python integers.
+    """
+
+    name = "gmpy2"
+
+    def inv(self, a:int, p:int) -> int:
+        if (a %p == 0):
+            raise ValueError("base is not invertible for the given modulus")
+        return int(gmpy2.invert(a,p))
+
+    def pow(self, a:int, e:int, p:int) -> int:
+        if (e < 0):
+            return int(gmpy2.powmod(gmpy2.invert(a,p),-e,p))
+        return int(gmpy2.powmod(a,e,p))
+
+    def legendre(self, a:int, p:int) -> int:
+        if (p == 2):
+            # gmpy2.legendre only takes odd primes
+            return a %2
+        return int(gmpy2.legendre(a,p))
+
+
+class SqrtContext:
+    """
+    A class to hold everything about a prime p that square roots mod p can reuse.
+
+    ...
+
+    Attributes
+    ----------
+    p : int
+        the prime
+    field : FieldBackend
+        the backend used for the exponentiations
+    method : str
+        "exponent" for p = 3 (mod 4), "atkin" for p = 5 (mod 8), "tonelli-shanks" or "cipolla" for p = 1 (mod 8)
+    Q, S : int
+        the decomposition p-1 = Q*2^S with Q odd
+    nonResidue : int | None
+        the smallest quadratic non-residue mod p, only found when p = 1 (mod 8)
+
+    Methods
+    -------
+    sqrt(self, a):
+        Return a square root of a mod p, or None if a is not a quadratic residue.
+    """
+
+    def __init__(self, p:int, field:FieldBackend | None = None):
+        """
+        Inits the square root context of a prime p, choosing the method by p mod 8 and the 2-adic valuation S of p-1.
+        """
+        assert p>=2,"p must be a prime greater than or equal to 2"
+        self.p = p
+        self.field = field or getBackend()
+        Q = p-1
+        S = 0
+        while (Q > 0 and Q%2 == 0):
+            Q = Q>>1
+            S = S+1
+        self.Q = Q
+        self.S = S
+        self.nonResidue = None
+        if (p == 2):
+            self.method = "identity"
+        elif (p%4 == 3):
+            self.method = "exponent"
+            self._exponent = (p+1)>>2
+        elif (p%8 == 5):
+            self.method = "atkin"
+            self._exponent = (p-5)>>3
+        else:
+            z = 2
+            while (self.field.legendre(z,p) != -1):
+                z = z+1
+            self.nonResidue = z
+            w = min(S,_SQRT_TABLE_WINDOW)
+            if (S*S > _CIPOLLA_MIN_COST_RATIO*w*p.bit_length()):
+                self.method = "cipolla"
+            else:
+                self.method = "tonelli-shanks"
+                self._buildTables(w)
+
+    def _buildTables(self, w:int):
+        p = self.p
+        g = self.field.pow(self.nonResidue,self.Q,p)
+        gInv = self.field.inv(g,p)
+        self._window = w
+        self._windows = -(-self.S//w)
+        self._tables = []
+        step = gInv
+        for i in range(self._windows):
+            row = [1]
+            for j in range(1,1<<w):
+                row.append((row[-1]*step) %p)
+            self._tables.append(row)
+            step = self.field.pow(step,1<<w,p)
+        lowOrder = self.field.pow(g,1<<(self.S-w),p)
+        self._digitOf = {}
+        acc = 1
+        for j in range(1<<w):
+            self._digitOf[acc] = j
+            acc = (acc*lowOrder) %p
+
+    def sqrt(self, a:int) -> int | None:
+        """
+        Return a square root of a mod p, or None if a is not a quadratic residue.
+
+            Parameters:
+                    a : The integer to find the root of
+
+            Details:
+                    p = 3 (mod 4) takes a^((p+1)/4) and p = 5 (mod 8) uses Atkin's formula, both a single exponentiation.\n
+                    Otherwise Tonelli-Shanks solves the discrete log of a^Q in the 2-Sylow subgroup w bits at a time with\n
+                    Bernstein's precomputed tables, so it costs one exponentiation and about S^2/2w squarings.\n
+                    When S is so large that this exceeds Cipolla's exponentiation in F_p^2, Cipolla is used instead.\n
+                    https://cr.yp.to/papers/sqroot-20011123-retypeset20220327.pdf
+        """
+        p = self.p
+        a = a %p
+        if (a == 0 or self.method == "identity"):
+            return a
+        if (self.method == "exponent"):
+            r = self.field.pow(a,self._exponent,p)
+        elif (self.method == "atkin"):
+            a2 = (2*a) %p
+            b = self.field.pow(a2,self._exponent,p)
+            i = (a2*b*b) %p
+            r = (a*b*(i-1)) %p
+        elif (self.method == "cipolla"):
+            r = self._cipolla(a)
+        else:
+            r = self._tonelliShanks(a)
+        if (r == None or (r*r) %p != a):
+            return None
+        return r
+
+    def _tonelliShanks(self, a:int) -> int | None:
+        p = self.p
+        w = self._window
+        x = self.field.pow(a,(self.Q-1)>>1,p)
+        r = (a*x) %p
+        cur = (r*x) %p
+        e = 0
+        for i in range(self._windows):
+            shift = self.S - w*(i+1)
+            if (shift >= 0):
+                d = self._digitOf.get(pow(cur,1<<shift,p))
+            else:
+                d = self._digitOf.get(cur)
+                d = None if d == None else d>>(-shift)
+            if (d == None):
+                return None
+            e = e + (d<<(w*i))
+            cur = (cur*self._tables[i][d]) %p
+        if (e & 1):
+            return None
+        half = e>>1
+        mask = (1<<w)-1
+        for i in range(self._windows):
+            r = (r*self._tables[i][(half>>(w*i)) & mask]) %p
+        return r
+
+    def _cipolla(self, a:int) -> int | None:
+        p = self.p
+        if (self.field.legendre(a,p) != 1):
+            return None
+        t = 1
+        while (self.field.legendre(t*t-a,p) != -1):
+            t = t+1
+        d = (t*t-a) %p
+        x,y = 1,0
+        for bit in bin((p+1)>>1)[2:]:
+            x,y = (x*x + ((y*y) %p)*d) %p, (2*x*y) %p
+            if (bit == "1"):
+                x,y = (x*t + y*d) %p, (x + y*t) %p
+        return x
+
+
+def sqrtContext(p:int, field:FieldBackend | None = None) -> SqrtContext:
+    """
+    Return the SqrtContext of p for a field backend, by default the active one.\n
+    Contexts are kept in a small LRU cache so the decomposition of p-1, the non-residue and the tables are only built once.
+
+        Parameters:
+                p : The prime that the field is in relation to
+                field : The field backend to use
+    """
+    field = field or getBackend()
+    # a profiling proxy (see Profiling) is unwrapped so a cached context never keeps counting after the profile ends
+    field = getattr(field,"backend",field)
+    key = (field.name,p)
+    context = _sqrtContexts.get(key)
+    if (context != None):
+        _sqrtContexts.move_to_end(key)
+        return context
+    context = SqrtContext(p,field)
+    _sqrtContexts[key] = context
+    if (len(_sqrtContexts) > _SQRT_CONTEXT_CACHE_MAXSIZE):
+        _sqrtContexts.popitem(last=False)
+    return context
+
+
+_backends = {"python": FieldBackend()}
+_active = None
+_gmpy2Checked = False
+
+def _loadGmpy2():
+    """Return the gmpy2 module, importing it and registering its backend on first use, or None if it is not installed"""
+    global gmpy2, _gmpy2Checked
+    if (not _gmpy2Checked):
+        _gmpy2Checked = True
+        try:
+            import gmpy2 as module
+        except ImportError:
+            return None
+        gmpy2 = module
+        _backends["gmpy2"] = Gmpy2FieldBackend()
+    return gmpy2
+
+def availableBackends() -> list[str]:
+    """Return the names of the field backends that can be used here"""
+    _loadGmpy2()
+    return list(_backends)
+
+def getBackend(name:str | None = None) -> FieldBackend:
+    """
+    Return the named field backend, or the active one: gmpy2 if it is importable and pure Python otherwise.\n
+    gmpy2 is only imported here, the first time a backend is needed, so importing the package stays cheap.
+
+        Parameters:
+                name : The name of the backend, see availableBackends
+    """
+    global _active
+    _loadGmpy2()
+    if (name != None):
+        assert name in _backends,"unknown or unavailable field backend "+str(name)
+        return _backends[name]
+    if (_active == None):
+        _active = _backends.get("gmpy2",_backends["python"])
+    return _active
+
+def setBackend(name:str) -> FieldBackend:
+    """
+    Make the named field backend the active one and return it.\n
+    Curves keep the backend that was active when they were built.
+
+        Parameters:
+                name : The name of the backend, see availableBackends
+    """
+    global _active
+    _active = getBackend(name)
+    return _active
+
+def compareBackends(p:int, iterations:int = 10000, seed:int = 0) -> dict[str,dict[str,float]]:
+    """
+    Return the operations per second of every available backend, for each field operation mod p.
+
+        Parameters:
+                p : The prime to benchmark with
+                iterations : The number of calls timed per operation
+                seed : The seed for the random operands
+    """
+    rng = random.Random(seed)
+    operands = [(rng.randrange(1,p),rng.randrange(1,p)) for i in range(iterations)]
+    squares = [(a*a) %p for (a,b) in operands[:max(1,iterations//10)]]
+    results = {}
+    _loadGmpy2()
+    for name,backend in _backends.items():
+        timings = {}
+        cases = {"mul": (lambda: [backend.mul(a,b,p) for (a,b) in operands], iterations),
+                 "sqr": (lambda: [backend.sqr(a,p) for (a,b) in operands], iterations),
+                 "inv": (lambda: [backend.inv(a,p) for (a,b) in operands], iterations),
+                 "pow": (lambda: [backend.pow(a,b,p) for (a,b) in operands], iterations),
+                 "legendre": (lambda: [backend.legendre(a,p) for (a,b) in operands], iterations),
+                 "sqrt": (lambda: [backend.sqrt(s,p) for s in squares], len(squares))}
+        for op,(run,count) in cases.items():
+            start = time.perf_counter()
+            run()
+            timings[op] = count/(time.perf_counter()-start)
+        results[name] = timings
+    return results
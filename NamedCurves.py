@@ -0,0 +1,108 @@
+import FieldBackends
+from FFEllipticCurves import FiniteFieldEllipticCurve, Point
+
+# name : (p, a, b, gx, gy, n, h) as in SEC1, n is the order of the generator and h the cofactor
+_CURVE_PARAMETERS = {
+    "secp256k1": (0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+                  0,
+                  7,
+                  0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+                  0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+                  0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+                  1),
+    "secp256r1": (0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+                  -3,
+                  0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+                  0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+                  0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,
+                  0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+                  1),
+    "secp384r1": (0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFFFF0000000000000000FFFFFFFF,
+                  -3,
+                  0xB3312FA7E23EE7E4988E056BE3F82D19181D9C6EFE8141120314088F5013875AC656398D8A2ED19D2A85C8EDD3EC2AEF,
+                  0xAA87CA22BE8B05378EB1C71EF320AD746E1D3B628BA79B9859F741E082542A385502F25DBF55296C3A545E3872760AB7,
+                  0x3617DE4A96262C6F5D9E98BF9292DC29F8F41DBD289A147CE9DA3113B5F0B8C00A60B1CE1D7E819D7A431D7C90EA0E5F,
+                  0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFC7634D81F4372DDF581A0DB248B0A77AECEC196ACCC52973,
+                  1),
+    # Curve25519, v^2 = u^3 + 486662u^2 + u, in short Weierstrass form (Wei25519), x = u + 486662/3
+    "curve25519": (0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFED,
+                   0x2AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA984914A144,
+                   0x7B425ED097B425ED097B425ED097B425ED097B425ED097B4260B5E9C7710C864,
+                   0x2AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAD245A,
+                   0x20AE19A1B8A086B4E01EDD2C7748D14C923D4D7E6D7C61B229E9C5A27ECED3D9,
+                   0x1000000000000000000000000000000014DEF9DEA2F79CD65812631A5CF5D3ED,
+                   8),
+    # small curves for teaching, small enough to enumerate and plot
+    "toy17": (17, 2, 2, 5, 1, 19, 1),
+    "toy97": (97, 2, 3, 3, 6, 5, 20),
+    "toy751": (751, -1, 188, 0, 375, 727, 1),
+}
+
+_ALIASES = {
+    "P-256": "secp256r1",
+    "prime256v1": "secp256r1",
+    "P-384": "secp384r1",
+    "Wei25519": "curve25519",
+}
+
+_namedCurves = {}
+
+
+class NamedCurve(FiniteFieldEllipticCurve):
+    """
+    A class to represent a standard elliptic curve over a finite field together with its domain parameters.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        the name the curve is registered under
+    generator : Point
+        the standard base point G
+    n : int
+        the order of the generator
+    h : int
+        the cofactor, the number of points on the curve is n*h
+    """
+
+    def __init__(self, name:str, p:int, a:int, b:int, gx:int, gy:int, n:int, h:int, backend:str | None = None):
+        """
+        Inits a named curve from its SEC1 domain parameters (p,a,b,G,n,h).\n
+        The parameters are trusted, so p is not tested for primality and the group order n*h is cached up front.
+        """
+        super().__init__(a,b,p,backend,checkPrime=False)
+        self.name = name
+        self.n = n
+        self.h = h
+        self._cardinality = ((a,b,p),n*h)
+        self._sqrt = FieldBackends.sqrtContext(p,self.field)
+        self.generator = Point._unchecked(self,gx,gy)
+
+    def __repr__(self) -> str:
+        return "namedCurve("+repr(self.name)+")"
+
+
+def availableCurves() -> list[str]:
+    """Return the names of the registered curves, aliases such as P-256 are accepted by namedCurve too"""
+    return list(_CURVE_PARAMETERS)
+
+def namedCurve(name:str, backend:str | None = None) -> NamedCurve:
+    """
+    Return the registered curve with the given name.\n
+    Curves are built on first use and then memoized, so later calls return the same object.
+
+        Parameters:
+                name : The name of the curve, see availableCurves, or an alias such as P-256
+                backend : The FieldBackends backend to use, by default the active one
+    """
+    name = _ALIASES.get(name,name)
+    assert name in _CURVE_PARAMETERS,"unknown curve "+str(name)+", see availableCurves()"
+    if (backend == None):
+        backend = FieldBackends.getBackend().name
+    key = (name,backend)
+    curve = _namedCurves.get(key)
+    if (curve == None):
+        curve = NamedCurve(name,*_CURVE_PARAMETERS[name],backend)
+        _namedCurves[key] = curve
+    return curve
@@ -0,0 +1,505 @@
+import math
+import random
+import FieldBackends
+from FFEllipticCurves import FiniteFieldEllipticCurve, isQuadraticResidue, _isProbablePrime
+
+_ENUMERATION_MAX_P = 1<<14
+_BSGS_MAX_P = 1<<40
+_SCHOOF_BSGS_SLACK_BITS = 32
+_ORDER_RESOLUTION_TRIES = 16
+_DIRECT_CHECK_MAX_CANDIDATES = 64
+
+
+def countPoints(curve:FiniteFieldEllipticCurve, method:str = "auto") -> int:
+    """
+    Return the number of points on the curve including the point at infinity.
+
+        Parameters:
+                curve : The curve to count the points of
+                method : "enumerate", "bsgs", "schoof" or "auto" (default), which picks by the size of p
+
+        Details:
+                "enumerate" sums the Legendre symbol of x^3+ax+b over every x, O(p) time and O(1) memory.\n
+                "bsgs" finds the order in the Hasse interval with baby-step giant-step on random points of the curve\n
+                and of its quadratic twist (Mestre's method), O(p^(1/4)) time and memory.\n
+                "schoof" computes the trace of Frobenius modulo small primes l with Schoof's algorithm,\n
+                which is polynomial in log(p), and resolves the last few bits with baby-step giant-step.\n
+                "auto" uses enumeration below 2^14, baby-step giant-step below 2^40 and Schoof above.
+    """
+    assert method in ("auto","enumerate","bsgs","schoof"),"method must be 'auto', 'enumerate', 'bsgs' or 'schoof'"
+    if (method == "auto"):
+        if (curve.p < _ENUMERATION_MAX_P):
+            method = "enumerate"
+        elif (curve.p < _BSGS_MAX_P):
+            method = "bsgs"
+        else:
+            method = "schoof"
+    if (method == "enumerate"):
+        return enumerationPointCount(curve)
+    if (method == "bsgs"):
+        return bsgsPointCount(curve)
+    return schoofPointCount(curve)
+
+def enumerationPointCount(curve:FiniteFieldEllipticCurve) -> int:
+    """
+    Return the number of points on the curve including the point at infinity, by counting the square roots of x^3+ax+b for every x.
+
+        Parameters:
+                curve : The curve to count the points of
+    """
+    p = curve.p
+    if (p == 2):
+        return len(curve.generatePoints())
+    half = (p-1)>>1
+    count = 1
+    for x in range(p):
+        ls = pow(curve._y2Value(x),half,p)
+        if (ls == 0):
+            count = count+1
+        elif (ls == 1):
+            count = count+2
+    return count
+
+def bsgsPointCount(curve:FiniteFieldEllipticCurve) -> int:
+    """
+    Return the number of points on the curve including the point at infinity, using Mestre's baby-step giant-step method.
+
+        Parameters:
+                curve : The curve to count the points of, must be non-singular with p > 229
+
+        Details:
+                By Hasse's theorem the order N lies in [p+1-2sqrt(p), p+1+2sqrt(p)].\n
+                For a random point P, baby-step giant-step finds every N in the interval with N*P = (None,None).\n
+                Points of the quadratic twist, whose order is 2p+2-N, are used to rule out the remaining candidates.\n
+                Mestre showed this always leaves a single candidate for p > 229.\n
+                https://en.wikipedia.org/wiki/Counting_points_on_elliptic_curves#Baby-step_giant-step
+    """
+    p = curve.p
+    assert p > 229,"baby-step giant-step point counting needs p > 229"
+    assert _isNonSingular(curve),"curve must be non-singular"
+    T = math.isqrt(4*p)
+    candidates = _resolveGroupOrder(curve, p+1-T, 1, 2*T)
+    if (len(candidates) != 1):
+        raise Exception("could not determine the group order of "+str(curve))
+    return candidates[0]
+
+def bsgsOrderMultiple(curve:FiniteFieldEllipticCurve, x:int, y:int) -> int:
+    """
+    Return a multiple of the order of the point (x,y) lying in the Hasse interval, found with baby-step giant-step.
+
+        Parameters:
+                curve : The curve the point lies on, must be non-singular
+                x : The x coordinate
+                y : The y coordinate
+    """
+    p = curve.p
+    T = math.isqrt(4*p)
+    base = max(p+1-T,1)
+    return base + _bsgsMatches(curve,x,y,base,1,p+1+T-base)[0]
+
+def schoofPointCount(curve:FiniteFieldEllipticCurve) -> int:
+    """
+    Return the number of points on the curve including the point at infinity, using Schoof's algorithm.
+
+        Parameters:
+                curve : The curve to count the points of, must be non-singular with p > 3
+
+        Details:
+                The order is N = p+1-t where the trace t satisfies |t| <= 2sqrt(p).\n
+                For small primes l the Frobenius map (x,y) -> (x^p,y^p) satisfies pi^2 - t*pi + p = 0 on the l-torsion,\n
+                so t mod l is found by working with polynomials modulo the l-th division polynomial.\n
+                Once the product of the primes used leaves at most 2^32 candidates for t,\n
+                baby-step giant-step on random points picks the right one, otherwise more primes are added.\n
+                Polynomial products use Kronecker substitution, through gmpy2 when it is installed.\n
+                https://en.wikipedia.org/wiki/Schoof%27s_algorithm
+    """
+    p = curve.p
+    a = curve.a %p
+    b = curve.b %p
+    assert p > 3,"Schoof's algorithm needs p > 3"
+    assert _isNonSingular(curve),"curve must be non-singular"
+    T = math.isqrt(4*p)
+    divisionPolynomials = _DivisionPolynomials(a,b,p)
+    residues = [(_schoofTraceModTwo(a,b,p),2)]
+    l = 2
+    while (True):
+        t0,M = _crt(residues)
+        kLo = -((T+t0)//M)
+        kHi = (T-t0)//M
+        base = p+1-t0-kLo*M
+        if (kHi == kLo):
+            return base
+        if ((M<<_SCHOOF_BSGS_SLACK_BITS) > 2*T):
+            candidates = _resolveGroupOrder(curve, base, -M, kHi-kLo)
+            if (len(candidates) == 1):
+                return candidates[0]
+        l = l+1
+        while (not _isProbablePrime(l)):
+            l = l+1
+        if (l == p):
+            continue
+        residues.append((_schoofTraceModPrime(a,b,p,l,divisionPolynomials.get(l)),l))
+
+def _isNonSingular(curve:FiniteFieldEllipticCurve) -> bool:
+    return (4*pow(curve.a,3,curve.p) + 27*pow(curve.b,2,curve.p)) %curve.p != 0
+
+def _crt(residues:list[tuple[int,int]]) -> tuple[int,int]:
+    r,M = 0,1
+    for (ri,mi) in residues:
+        r = r + M*(((ri-r)*pow(M,-1,mi)) %mi)
+        M = M*mi
+    return r %M, M
+
+def _randomPoint(curve:FiniteFieldEllipticCurve) -> tuple[int,int]:
+    p = curve.p
+    sqrt = curve._sqrtContext().sqrt
+    while (True):
+        x = random.randrange(p)
+        y = sqrt(curve._y2Value(x))
+        if (y != None):
+            return x,y
+
+def _quadraticTwist(curve:FiniteFieldEllipticCurve) -> FiniteFieldEllipticCurve:
+    p = curve.p
+    d = 2
+    while (isQuadraticResidue(p,d)):
+        d = d+1
+    return FiniteFieldEllipticCurve((curve.a*d*d) %p, (curve.b*d*d*d) %p, p)
+
+def _signedMultiple(curve:FiniteFieldEllipticCurve, x:int, y:int, s:int) -> tuple[int,int] | tuple[None,None]:
+    qx,qy = curve.pointMultiplication(x,y,abs(s))
+    if (s < 0 and qx != None):
+        qy = (-qy) %curve.p
+    return qx,qy
+
+def _bsgsMatches(curve:FiniteFieldEllipticCurve, x:int, y:int, base:int, step:int, count:int) -> list[int]:
+    """
+    Return every j in [0,count] with (base + j*step)*(x,y) = (None,None), using baby-step giant-step.
+    """
+    p = curve.p
+    rx,ry = _signedMultiple(curve,x,y,base)
+    qx,qy = _signedMultiple(curve,x,y,step)
+    if (qx == None):
+        return list(range(count+1)) if rx == None else []
+    m = math.isqrt(count)+1
+    jacobianBaby = [(1,1,0)]
+    X,Y,Z = qx,qy,1
+    order = None
+    for i in range(1,m):
+        if (Z == 0):
+            order = i
+            break
+        jacobianBaby.append((X,Y,Z))
+        X,Y,Z = curve._jacobianMixedAdd(X,Y,Z,qx,qy)
+    if (order == None and Z == 0):
+        order = m
+    baby = {}
+    for i,point in enumerate(curve.batchNormalize(jacobianBaby)):
+        baby[point] = i
+    target = (rx,(-ry) %p) if rx != None else (None,None)
+    if (order != None):
+        if (target not in baby):
+            return []
+        return list(range(baby[target],count+1,order))
+    mx,my = curve._fromJacobian(X,Y,Z)
+    giantStep = (mx,(-my) %p)
+    matches = []
+    X,Y,Z = curve._toJacobian(*target)
+    g = 0
+    while (g*m <= count):
+        chunk = []
+        while (len(chunk) < 4096 and (g+len(chunk))*m <= count):
+            chunk.append((X,Y,Z))
+            X,Y,Z = curve._jacobianMixedAdd(X,Y,Z,*giantStep)
+        for point in curve.batchNormalize(chunk):
+            i = baby.get(point)
+            if (i != None and g*m+i <= count):
+                matches.append(g*m+i)
+            g = g+1
+    return matches
+
+def _resolveGroupOrder(curve:FiniteFieldEllipticCurve, base:int, step:int, count:int) -> list[int]:
+    """
+    Return the candidates N = base + j*step, 0 <= j <= count, consistent with the orders of random points on the curve and its twist.
+    """
+    if (count == 0):
+        return [base]
+    twist = None
+    candidates = None
+    for attempt in range(_ORDER_RESOLUTION_TRIES):
+        if (attempt%2 == 0):
+            E,Ebase,Estep = curve,base,step
+        else:
+            if (twist == None):
+                twist = _quadraticTwist(curve)
+            E,Ebase,Estep = twist,2*curve.p+2-base,-step
+        x,y = _randomPoint(E)
+        if (candidates == None or len(candidates) > _DIRECT_CHECK_MAX_CANDIDATES):
+            matches = set(_bsgsMatches(E,x,y,Ebase,Estep,count))
+            candidates = matches if candidates == None else candidates & matches
+        else:
+            candidates = {j for j in candidates if E.pointMultiplication(x,y,Ebase+j*Estep) == (None,None)}
+        if (len(candidates) <= 1):
+            break
+    return sorted(base+j*step for j in candidates)
+
+
+def _polyTrim(a:list[int]) -> list[int]:
+    while (a and a[-1] == 0):
+        a.pop()
+    return a
+
+def _polyAdd(a:list[int], b:list[int], p:int) -> list[int]:
+    if (len(a) < len(b)):
+        a,b = b,a
+    return _polyTrim([(c + (b[i] if i < len(b) else 0)) %p for i,c in enumerate(a)])
+
+def _polySub(a:list[int], b:list[int], p:int) -> list[int]:
+    n = max(len(a),len(b))
+    return _polyTrim([((a[i] if i < len(a) else 0) - (b[i] if i < len(b) else 0)) %p for i in range(n)])
+
+def _polyScale(a:list[int], c:int, p:int) -> list[int]:
+    return _polyTrim([(c*v) %p for v in a])
+
+def _polyMul(a:list[int], b:list[int], p:int) -> list[int]:
+    """
+    Return the product of two polynomials over F_p using Kronecker substitution.\n
+    Both are packed into big integers with fixed width slots, multiplied once, and unpacked.
+    """
+    if (not a or not b):
+        return []
+    if (len(a) < 16 or len(b) < 16):
+        out = [0]*(len(a)+len(b)-1)
+        for i,c in enumerate(a):
+            if (c):
+                for j,d in enumerate(b):
+                    out[i+j] = out[i+j] + c*d
+        return _polyTrim([v %p for v in out])
+    width = (2*p.bit_length() + min(len(a),len(b)).bit_length() + 7)//8
+    A = int.from_bytes(b"".join(c.to_bytes(width,"little") for c in a),"little")
+    if (a is b):
+        B = A
+    else:
+        B = int.from_bytes(b"".join(c.to_bytes(width,"little") for c in b),"little")
+    gmpy2 = FieldBackends._loadGmpy2()
+    if (gmpy2 != None):
+        C = int(gmpy2.mpz(A)*gmpy2.mpz(B))
+    else:
+        C = A*B
+    n = len(a)+len(b)-1
+    data = memoryview(C.to_bytes(n*width,"little"))
+    return _polyTrim([int.from_bytes(data[i*width:(i+1)*width],"little") %p for i in range(n)])
+
+def _polyRem(a:list[int], b:list[int], p:int) -> list[int]:
+    a = list(a)
+    n = len(b)
+    lcInv = pow(b[-1],-1,p)
+    for i in range(len(a)-1,n-2,-1):
+        c = (a[i]*lcInv) %p
+        if (c):
+            offset = i-n+1
+            for j in range(n):
+                a[offset+j] = (a[offset+j] - c*b[j]) %p
+    return _polyTrim(a[:n-1])
+
+def _polyMonic(a:list[int], p:int) -> list[int]:
+    return _polyScale(a,pow(a[-1],-1,p),p)
+
+def _polyGcd(a:list[int], b:list[int], p:int) -> list[int]:
+    while (b):
+        a,b = b,_polyRem(a,b,p)
+    return _polyMonic(a,p)
+
+def _seriesInverse(f:list[int], n:int, p:int) -> list[int]:
+    g = [pow(f[0],-1,p)]
+    precision = 1
+    while (precision < n):
+        precision = min(2*precision,n)
+        e = _polyMul(f[:precision],g,p)[:precision]
+        e = [(-v) %p for v in e]
+        if (e):
+            e[0] = (e[0]+2) %p
+        else:
+            e = [2]
+        g = _polyMul(g,e,p)[:precision]
+    return g
+
+
+class _PolyRing:
+    """
+    Arithmetic in F_p[x]/(h) for a monic h, with remainders computed from a precomputed inverse of the reversed modulus.
+    """
+
+    def __init__(self, h:list[int], p:int):
+        self.h = h
+        self.p = p
+        self.n = len(h)-1
+        self.hRevInv = _seriesInverse(h[::-1],max(self.n-1,1),p)
+
+    def reduce(self, a:list[int]) -> list[int]:
+        n = self.n
+        m = len(a)-1
+        if (m < n):
+            return a
+        if (m > 2*n-2):
+            return _polyRem(a,self.h,self.p)
+        k = m-n+1
+        qRev = _polyMul(a[::-1][:k],self.hRevInv[:k],self.p)[:k]
+        q = (qRev + [0]*(k-len(qRev)))[::-1]
+        qh = _polyMul(q,self.h,self.p)
+        return _polySub(a[:n],qh[:n],self.p)
+
+    def mul(self, a:list[int], b:list[int]) -> list[int]:
+        return self.reduce(_polyMul(a,b,self.p))
+
+    def pow(self, a:list[int], e:int) -> list[int]:
+        table = [[1],a]
+        for i in range(2,16):
+            table.append(self.mul(table[-1],a))
+        result = [1]
+        for shift in range(((e.bit_length()-1)//4)*4,-1,-4):
+            if (result != [1]):
+                for i in range(4):
+                    result = self.mul(result,result)
+            digit = (e>>shift) & 15
+            if (digit):
+                result = self.mul(result,table[digit])
+        return result
+
+    def jacobianDouble(self, A:list[int], X:list[int], Y:list[int], Z:list[int]) -> tuple[list[int],list[int],list[int]]:
+        p = self.p
+        XX = self.mul(X,X)
+        YY = self.mul(Y,Y)
+        YYYY = self.mul(YY,YY)
+        ZZ = self.mul(Z,Z)
+        S = _polyScale(self.mul(X,YY),4,p)
+        M = _polyAdd(_polyScale(XX,3,p),self.mul(A,self.mul(ZZ,ZZ)),p)
+        X3 = _polySub(self.mul(M,M),_polyScale(S,2,p),p)
+        Y3 = _polySub(self.mul(M,_polySub(S,X3,p)),_polyScale(YYYY,8,p),p)
+        Z3 = _polyScale(self.mul(Y,Z),2,p)
+        return X3,Y3,Z3
+
+    def jacobianDifference(self, X1:list[int], Y1:list[int], Z1:list[int], x2:list[int], y2:list[int]) -> tuple[list[int],list[int]]:
+        Z1Z1 = self.mul(Z1,Z1)
+        H = _polySub(self.mul(x2,Z1Z1),X1,self.p)
+        r = _polySub(self.mul(y2,self.mul(Z1,Z1Z1)),Y1,self.p)
+        return H,r
+
+    def jacobianMixedAdd(self, X1:list[int], Y1:list[int], Z1:list[int], H:list[int], r:list[int]) -> tuple[list[int],list[int],list[int]]:
+        p = self.p
+        HH = self.mul(H,H)
+        HHH = self.mul(H,HH)
+        V = self.mul(X1,HH)
+        X3 = _polySub(_polySub(self.mul(r,r),HHH,p),_polyScale(V,2,p),p)
+        Y3 = _polySub(self.mul(r,_polySub(V,X3,p)),self.mul(Y1,HHH),p)
+        Z3 = self.mul(Z1,H)
+        return X3,Y3,Z3
+
+
+class _DivisionPolynomials:
+    """
+    The division polynomials of y^2 = x^3 + ax + b over F_p, with the factor y removed from the even ones.
+    """
+
+    def __init__(self, a:int, b:int, p:int):
+        self.p = p
+        F = [b,a,0,1]
+        self.F2 = _polyMul(F,F,p)
+        self.half = pow(2,-1,p)
+        self.f = {0: [],
+                  1: [1],
+                  2: [2],
+                  3: _polyTrim([(-a*a) %p, (12*b) %p, (6*a) %p, 0, 3]),
+                  4: _polyTrim([(4*(-8*b*b - a*a*a)) %p, (4*(-4*a*b)) %p, (4*(-5*a*a)) %p, (4*20*b) %p, (4*5*a) %p, 0, 4])}
+
+    def get(self, n:int) -> list[int]:
+        if (n in self.f):
+            return self.f[n]
+        p = self.p
+        m = n>>1
+        if (n%2 == 1):
+            left = _polyMul(self.get(m+2),_polyMul(self.get(m),_polyMul(self.get(m),self.get(m),p),p),p)
+            right = _polyMul(self.get(m-1),_polyMul(self.get(m+1),_polyMul(self.get(m+1),self.get(m+1),p),p),p)
+            if (m%2 == 0):
+                left = _polyMul(self.F2,left,p)
+            else:
+                right = _polyMul(self.F2,right,p)
+            result = _polySub(left,right,p)
+        else:
+            inner = _polySub(_polyMul(self.get(m+2),_polyMul(self.get(m-1),self.get(m-1),p),p),
+                             _polyMul(self.get(m-2),_polyMul(self.get(m+1),self.get(m+1),p),p),p)
+            result = _polyScale(_polyMul(self.get(m),inner,p),self.half,p)
+        self.f[n] = result
+        return result
+
+def _schoofTraceModTwo(a:int, b:int, p:int) -> int:
+    F = [b,a,0,1]
+    ring = _PolyRing(F,p)
+    xp = ring.pow([0,1],p)
+    if (len(_polyGcd(F,_polySub(xp,[0,1],p),p)) > 1):
+        return 0
+    return 1
+
+def _schoofTraceModPrime(a:int, b:int, p:int, l:int, psi:list[int]) -> int:
+    """
+    Return t mod l, for an odd prime l != p, from the action of Frobenius on a point P of order l.\n
+    P is the generic point whose x coordinate is a root of h, a factor of the l-th division polynomial.\n
+    Points (X, Y*y) are mapped to (X*F, Y*F^2) on y^2 = x^3 + aF^2 x + bF^3, where F = x^3+ax+b, so y never appears.\n
+    When a denominator is a zero divisor, h is replaced by the factor on which it vanishes, any factor gives the same t mod l.
+    """
+    q = p%l
+    h = _polyMonic(psi,p)
+    ring = _PolyRing(h,p)
+    F = ring.reduce([b,a,0,1])
+    xp = ring.pow([0,1],p)
+    fp = ring.pow(F,(p-1)>>1)
+    xpp = ring.pow(xp,p)
+    fpp = ring.mul(ring.pow(fp,p),fp)
+    while (True):
+        F2 = ring.mul(F,F)
+        A = _polyScale(F2,a,p)
+        x0,y0 = ring.mul([0,1],F),F2
+        x1,y1 = ring.mul(xp,F),ring.mul(fp,F2)
+        x2,y2 = ring.mul(xpp,F),ring.mul(fpp,F2)
+
+        X,Y,Z = x0,y0,[1]
+        for bit in bin(q)[3:]:
+            X,Y,Z = ring.jacobianDouble(A,X,Y,Z)
+            if (bit == '1'):
+                H,r = ring.jacobianDifference(X,Y,Z,x0,y0)
+                X,Y,Z = ring.jacobianMixedAdd(X,Y,Z,H,r)
+
+        H,r = ring.jacobianDifference(X,Y,Z,x2,y2)
+        g = _polyGcd(ring.h,H,p) if H else ring.h
+        if (len(g) == 1):
+            S = ring.jacobianMixedAdd(X,Y,Z,H,r)
+            break
+        if (len(g) < len(ring.h)):
+            ring = _PolyRing(g,p)
+        else:
+            if (not r):
+                S = ring.jacobianDouble(A,X,Y,Z)
+                break
+            g = _polyGcd(ring.h,r,p)
+            if (len(g) == 1):
+                return 0
+            ring = _PolyRing(g,p)
+        F,xp,fp,xpp,fpp = [_polyRem(v,ring.h,p) if len(v) >= len(ring.h) else v for v in (F,xp,fp,xpp,fpp)]
+
+    XS,YS,ZS = S
+    ZS2 = ring.mul(ZS,ZS)
+    ZS3 = ring.mul(ZS2,ZS)
+    X,Y,Z = x1,y1,[1]
+    for tau in range(1,(l-1)//2+1):
+        if (tau == 2):
+            X,Y,Z = ring.jacobianDouble(A,X,Y,Z)
+        elif (tau > 2):
+            H,r = ring.jacobianDifference(X,Y,Z,x1,y1)
+            X,Y,Z = ring.jacobianMixedAdd(X,Y,Z,H,r)
+        ZZ = ring.mul(Z,Z)
+        if (_polySub(ring.mul(XS,ZZ),ring.mul(X,ZS2),p)):
+            continue
+        if (_polySub(ring.mul(YS,ring.mul(ZZ,Z)),ring.mul(Y,ZS3),p)):
+            return l-tau
+        return tau
+    raise Exception("no trace found modulo "+str(l)+", is the curve non-singular?")
@@ -0,0 +1,262 @@
+import time
+
+# public FiniteFieldEllipticCurve methods whose calls and inclusive wall time are recorded
+_TIMED_METHODS = ("point","generatePoints","pointIndex","writePointTable","pointAddition","pointMultiplication",
+                  "sharedSecretX","batchNormalize","batchPointAddition","multiScalarMultiplication","precomputeGenerator",
+                  "generatePointsFromGenerator","pointCompression","pointDecompression","encodePoint","decodePoint",
+                  "encodePoints","decodePoints","groupCardinality","pointOrder","subgroupCardinality","isGenerator",
+                  "generators","cofactor")
+_FIELD_OPERATIONS = ("mul","sqr","inv","pow","legendre","sqrt")
+
+
+def _jacobianDoubleCost(curve, X:int, Y:int, Z:int) -> tuple[int,int] | None:
+    if (Z == 0 or Y == 0):
+        return None
+    return 3 + (curve.a %curve.p != 0),6
+
+def _jacobianMixedAddCost(curve, X1:int, Y1:int, Z1:int, x2:int, y2:int) -> tuple[int,int] | None:
+    return (8,3) if Z1 != 0 else None
+
+def _jacobianAddCost(curve, X1:int, Y1:int, Z1:int, X2:int, Y2:int, Z2:int) -> tuple[int,int] | None:
+    return (12,4) if (Z1 != 0 and Z2 != 0) else None
+
+def _fromJacobianCost(curve, X:int, Y:int, Z:int) -> tuple[int,int] | None:
+    return (3,1) if Z %curve.p != 0 else None
+
+def _xOnlyDoubleCost(curve, X:int, Z:int) -> tuple[int,int]:
+    return 6,3
+
+def _xOnlyDifferentialAddCost(curve, X1:int, Z1:int, X2:int, Z2:int, x0:int) -> tuple[int,int]:
+    return 8,2
+
+def _batchNormalizeCost(curve, jacobianPoints:list) -> tuple[int,int]:
+    n = sum(1 for (X,Y,Z) in jacobianPoints if Z %curve.p != 0)
+    return 3*max(n-1,0) + 3*n,n
+
+# internal formulas that do their arithmetic inline : (reported name, cost function returning (multiplications, squarings))
+_FORMULAS = {
+    "_jacobianDouble": ("jacobianDouble",_jacobianDoubleCost),
+    "_jacobianMixedAdd": ("jacobianMixedAdd",_jacobianMixedAddCost),
+    "_jacobianAdd": ("jacobianAdd",_jacobianAddCost),
+    "_fromJacobian": ("fromJacobian",_fromJacobianCost),
+    "_xOnlyDouble": ("xOnlyDouble",_xOnlyDoubleCost),
+    "_xOnlyDifferentialAdd": ("xOnlyDifferentialAdd",_xOnlyDifferentialAddCost),
+    "batchNormalize": ("batchNormalize",_batchNormalizeCost),
+}
+
+
+class CurveProfile:
+    """
+    A class to represent the operation counts and method timings of a curve, recorded while used as a context manager.
+
+    ...
+
+    Entering the context puts counting wrappers on the curve instance and a counting proxy in place of curve.field,
+    leaving it removes them again, so a curve that is not being profiled runs exactly the same code as before.
+    Field operations made through the FieldBackend are counted as they happen, the Jacobian and x-only formulas,
+    which do their arithmetic inline, are charged their fixed number of multiplications and squarings per call.
+    The NumPy array paths, such as vectorized generatePoints, are timed but their elementwise arithmetic is not counted.
+
+    Attributes
+    ----------
+    curve : FiniteFieldEllipticCurve
+        the profiled curve
+    field : dict[str,int]
+        field operations by type: mul, sqr, inv, pow, legendre and sqrt
+    group : dict[str,int]
+        calls of the point formulas, such as jacobianDouble or jacobianMixedAdd
+    validation : dict[str,int]
+        validation checks, isElem
+    methods : dict[str,dict[str,float]]
+        calls and inclusive wall time in seconds of every public method that was called
+    elapsed : float
+        the wall time in seconds spent inside the context
+
+    Methods
+    -------
+    toDict(self):
+        Return all counts and timings as a dict.
+
+    toPrometheus(self, prefix, labels):
+        Return all counts and timings in the Prometheus text exposition format.
+    """
+
+    def __init__(self, curve, methods:bool = True):
+        """
+        Inits an empty profile of a curve, counting starts when the context is entered.\n
+        methods = False leaves out the per method timings and only counts operations.
+        """
+        self.curve = curve
+        self.field = {op: 0 for op in _FIELD_OPERATIONS}
+        self.group = {}
+        self.validation = {"isElem": 0}
+        self.methods = {}
+        self.elapsed = 0.0
+        self._timeMethods = methods
+        self._installed = []
+        self._backend = None
+        self._start = None
+
+    def __enter__(self) -> "CurveProfile":
+        curve = self.curve
+        assert curve._profile == None,"the curve is already being profiled"
+        curve._profile = self
+        self._backend = curve.field
+        curve.field = _CountingField(curve.field,self.field)
+        for name,(label,cost) in _FORMULAS.items():
+            self._install(name,self._countFormula(getattr(curve,name),label,cost))
+        self._install("isElem",self._countValidation(curve.isElem))
+        self._install("_sqrtContext",self._countSqrt(curve._sqrtContext))
+        if (self._timeMethods):
+            for name in _TIMED_METHODS:
+                self._install(name,self._timeMethod(getattr(curve,name),name))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback) -> bool:
+        self.elapsed = self.elapsed + time.perf_counter()-self._start
+        curve = self.curve
+        for name in self._installed:
+            curve.__dict__.pop(name,None)
+        self._installed = []
+        curve.field = self._backend
+        curve._profile = None
+        return False
+
+    def _install(self, name:str, wrapper):
+        self.curve.__dict__[name] = wrapper
+        self._installed.append(name)
+
+    def _countFormula(self, original, label:str, cost):
+        curve = self.curve
+        group = self.group
+        field = self.field
+        def counted(*args):
+            c = cost(curve,*args)
+            if (c != None):
+                group[label] = group.get(label,0)+1
+                field["mul"] = field["mul"]+c[0]
+                field["sqr"] = field["sqr"]+c[1]
+            return original(*args)
+        return counted
+
+    def _countValidation(self, original):
+        validation = self.validation
+        def counted(x, y):
+            validation["isElem"] = validation["isElem"]+1
+            return original(x,y)
+        return counted
+
+    def _countSqrt(self, original):
+        field = self.field
+        def counted():
+            return _CountingSqrt(original(),field)
+        return counted
+
+    def _timeMethod(self, original, name:str):
+        methods = self.methods
+        timer = time.perf_counter
+        def timed(*args, **kwargs):
+            start = timer()
+            try:
+                return original(*args,**kwargs)
+            finally:
+                entry = methods.get(name)
+                if (entry == None):
+                    entry = methods[name] = {"calls": 0, "seconds": 0.0}
+                entry["calls"] = entry["calls"]+1
+                entry["seconds"] = entry["seconds"]+timer()-start
+        return timed
+
+    def toDict(self) -> dict:
+        """Return the counts and timings as a dict with the keys field, group, validation, methods and elapsed"""
+        return {"field": dict(self.field),
+                "group": dict(self.group),
+                "validation": dict(self.validation),
+                "methods": {name: dict(entry) for name,entry in self.methods.items()},
+                "elapsed": self.elapsed}
+
+    def toPrometheus(self, prefix:str = "ecc", labels:dict[str,str] | None = None) -> str:
+        """
+        Return the counts and timings in the Prometheus text exposition format, for a metrics endpoint or textfile collector.
+
+            Parameters:
+                    prefix : The prefix of every metric name
+                    labels : Extra labels added to every sample, e.g. {"curve": "secp256k1"}
+
+            Details:
+                    The counters are <prefix>_field_operations_total{op}, <prefix>_group_operations_total{formula},\n
+                    <prefix>_validation_checks_total{check}, <prefix>_method_calls_total{method} and\n
+                    <prefix>_method_seconds_total{method}, plus the gauge <prefix>_profile_seconds.
+        """
+        labels = labels or {}
+        lines = []
+        def family(name:str, kind:str, doc:str, label:str, values:dict):
+            lines.append("# HELP "+prefix+"_"+name+" "+doc)
+            lines.append("# TYPE "+prefix+"_"+name+" "+kind)
+            for key,value in values.items():
+                lines.append(prefix+"_"+name+_formatLabels(dict(labels,**{label: key}))+" "+repr(value))
+        family("field_operations_total","counter","Field operations counted while profiling.","op",self.field)
+        family("group_operations_total","counter","Point formula evaluations counted while profiling.","formula",self.group)
+        family("validation_checks_total","counter","Point validation checks counted while profiling.","check",self.validation)
+        family("method_calls_total","counter","Calls of public curve methods while profiling.","method",{name: entry["calls"] for name,entry in self.methods.items()})
+        family("method_seconds_total","counter","Inclusive wall time of public curve methods while profiling.","method",{name: entry["seconds"] for name,entry in self.methods.items()})
+        lines.append("# HELP "+prefix+"_profile_seconds Wall time spent inside the profile.")
+        lines.append("# TYPE "+prefix+"_profile_seconds gauge")
+        lines.append(prefix+"_profile_seconds"+_formatLabels(labels)+" "+repr(self.elapsed))
+        return "\n".join(lines)+"\n"
+
+
+class _CountingField:
+    """A FieldBackend stand-in that counts every operation before passing it on to the real backend"""
+
+    def __init__(self, backend, counts:dict[str,int]):
+        self.backend = backend
+        self.name = backend.name
+        self._counts = counts
+
+    def mul(self, a:int, b:int, p:int) -> int:
+        self._counts["mul"] = self._counts["mul"]+1
+        return self.backend.mul(a,b,p)
+
+    def sqr(self, a:int, p:int) -> int:
+        self._counts["sqr"] = self._counts["sqr"]+1
+        return self.backend.sqr(a,p)
+
+    def inv(self, a:int, p:int) -> int:
+        self._counts["inv"] = self._counts["inv"]+1
+        return self.backend.inv(a,p)
+
+    def pow(self, a:int, e:int, p:int) -> int:
+        self._counts["pow"] = self._counts["pow"]+1
+        return self.backend.pow(a,e,p)
+
+    def legendre(self, a:int, p:int) -> int:
+        self._counts["legendre"] = self._counts["legendre"]+1
+        return self.backend.legendre(a,p)
+
+    def sqrt(self, a:int, p:int) -> int:
+        self._counts["sqrt"] = self._counts["sqrt"]+1
+        return self.backend.sqrt(a,p)
+
+
+class _CountingSqrt:
+    """A SqrtContext stand-in that counts square roots, everything else is read from the real context"""
+
+    def __init__(self, context, counts:dict[str,int]):
+        self.context = context
+        self._counts = counts
+
+    def sqrt(self, a:int) -> int | None:
+        self._counts["sqrt"] = self._counts["sqrt"]+1
+        return self.context.sqrt(a)
+
+    def __getattr__(self, name:str):
+        return getattr(self.context,name)
+
+
+def _formatLabels(labels:dict[str,str]) -> str:
+    if (len(labels) == 0):
+        return ""
+    escaped = [key+'="'+str(value).replace("\\","\\\\").replace('"','\\"').replace("\n","\\n")+'"' for key,value in labels.items()]
+    return "{"+",".join(escaped)+"}"
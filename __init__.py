@@ -1,6 +1,18 @@
-from EllipticCurves import EllipticCurve
+from EllipticCurves import EllipticCurve, pointsToArrays, arraysToPoints
 from FFEllipticCurves import FiniteFieldEllipticCurve
 from FFEllipticCurves import isQuadraticResidue
 from FFEllipticCurves import tonelliShanks
 from FFEllipticCurves import sqrtModPrime
-from FFEllipticCurves import diffieHellmanKeyExchangeExample
\ No newline at end of file
+from FFEllipticCurves import diffieHellmanKeyExchangeExample
+from FFEllipticCurves import FixedBaseMultiplier
+from FFEllipticCurves import GLVEndomorphism
+from PointCounting import countPoints
+from FFEllipticCurves import openPointTable
+from FFEllipticCurves import Point
+from FieldBackends import FieldBackend, SqrtContext, sqrtContext, getBackend, setBackend, availableBackends, compareBackends
+from DiscreteLog import discreteLog, pohligHellman, weakCurveReport
+from NamedCurves import NamedCurve, namedCurve, availableCurves
+from ECDSA import ECDSA
+from CurveCache import CurveCache
+from Profiling import CurveProfile
+from FFEllipticCurves import plotCurve
\ No newline at end of file
@@ -0,0 +1,9 @@
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if (_ROOT not in sys.path):
+    sys.path.insert(0,_ROOT)
+
+from .harness import runBenchmarks, compareResults, loadReport, writeReport, measure, summarize, percentile
+from .cases import BenchmarkCase, benchmarkCases
\ No newline at end of file
@@ -0,0 +1,63 @@
+import argparse
+import sys
+from . import runBenchmarks, compareResults, loadReport, writeReport, benchmarkCases
+
+_DEFAULT_THRESHOLD = 0.15
+_QUICK_REPEAT = 5
+
+
+def _printComparison(rows:list[dict], threshold:float):
+    for row in rows:
+        if (row["change"] == None):
+            status = "missing from "+("baseline" if row["baseline"] == None else "current")
+        else:
+            status = "%+.1f%%" % (100*row["change"]) + ("  REGRESSION" if row["regressed"] else "")
+        print("%-28s %s" % (row["name"],status),file=sys.stderr)
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if (regressed):
+        print("FAIL: %d case(s) slower than the baseline by more than %.0f%%: %s" % (len(regressed),100*threshold,", ".join(regressed)),file=sys.stderr)
+
+def main(argv:list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",description="Benchmark the curve arithmetic and compare against a stored baseline.")
+    commands = parser.add_subparsers(dest="command",required=True)
+    run = commands.add_parser("run",help="run the benchmarks and write a JSON report")
+    run.add_argument("--filter",default=None,help="regular expression selecting the cases by name")
+    run.add_argument("--repeat",type=int,default=15,help="timed samples per case")
+    run.add_argument("--quick",action="store_true",help="only %d samples per case" % _QUICK_REPEAT)
+    run.add_argument("--seed",type=int,default=0,help="seed the inputs are derived from")
+    run.add_argument("--backend",default=None,help="field backend to make active, see FieldBackends.availableBackends")
+    run.add_argument("--out",default=None,help="write the report here instead of standard output")
+    run.add_argument("--baseline",default=None,help="compare against this report and fail on regressions")
+    run.add_argument("--threshold",type=float,default=_DEFAULT_THRESHOLD,help="tolerated relative drop in ops/sec")
+    run.add_argument("--list",action="store_true",help="list the case names and exit")
+    compare = commands.add_parser("compare",help="compare two stored reports")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold",type=float,default=_DEFAULT_THRESHOLD,help="tolerated relative drop in ops/sec")
+    args = parser.parse_args(argv)
+
+    if (args.command == "compare"):
+        rows = compareResults(loadReport(args.baseline),loadReport(args.current),args.threshold)
+        _printComparison(rows,args.threshold)
+        return 1 if any(row["regressed"] for row in rows) else 0
+
+    cases = benchmarkCases()
+    if (args.list):
+        for case in cases:
+            print(case.name)
+        return 0
+    if (args.backend != None):
+        import FieldBackends
+        FieldBackends.setBackend(args.backend)
+    repeat = _QUICK_REPEAT if args.quick else args.repeat
+    progress = lambda name,metrics: print("%-28s %12.1f %s/s   p50 %10.1f us   p99 %10.1f us" % (name,metrics["opsPerSec"],metrics["unit"],metrics["p50Us"],metrics["p99Us"]),file=sys.stderr)
+    report = runBenchmarks(cases,repeat,args.filter,args.seed,progress)
+    writeReport(report,args.out)
+    if (args.baseline != None):
+        rows = compareResults(loadReport(args.baseline),report,args.threshold)
+        _printComparison(rows,args.threshold)
+        return 1 if any(row["regressed"] for row in rows) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
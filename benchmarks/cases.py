@@ -0,0 +1,143 @@
+import random
+from FFEllipticCurves import FiniteFieldEllipticCurve, sqrtModPrime
+from NamedCurves import namedCurve
+
+# primes of the sizes the scalar multiplication cases cover, 2^32-5, 2^127-1 and 2^521-1
+_PRIME_32 = (1<<32)-5
+_PRIME_128 = (1<<127)-1
+_PRIME_521 = (1<<521)-1
+# P-224's prime, p-1 = 2^96*q, the worst case for Tonelli-Shanks
+_PRIME_224 = (1<<224)-(1<<96)+1
+_INPUT_COUNT = 64
+_ENUMERATION_PRIMES = (1009,10007,100003)
+_DECODE_BATCH = 4096
+
+
+class BenchmarkCase:
+    """
+    A class to represent one benchmark, a named operation on inputs derived from a seed.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        the name the results are reported under, "group/variant"
+    setup : function
+        called with the seed, returns the function to time, which does opsPerCall operations per call
+    number : int
+        the number of calls per timed sample
+    opsPerCall : int
+        the number of operations one call does, for batch operations
+    unit : str
+        what one operation is
+    external : bool
+        setup returns a function of repeat that returns the seconds per operation of every run itself
+    """
+
+    def __init__(self, name:str, setup, number:int = 1, opsPerCall:int = 1, unit:str = "op", external:bool = False):
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.opsPerCall = opsPerCall
+        self.unit = unit
+        self.external = external
+
+
+def _randomCurve(p:int, rng:random.Random) -> tuple[FiniteFieldEllipticCurve,tuple[int,int]]:
+    """Return a curve with random a,b over F_p and a random point on it"""
+    curve = FiniteFieldEllipticCurve(rng.randrange(p),rng.randrange(p),p,checkPrime=False)
+    return curve,_randomPoint(curve,rng)
+
+def _randomPoint(curve:FiniteFieldEllipticCurve, rng:random.Random) -> tuple[int,int]:
+    while True:
+        x = rng.randrange(curve.p)
+        y = curve._sqrtContext().sqrt(curve._y2Value(x))
+        if (y != None):
+            return x,y
+
+def _cycle(values:list):
+    # a cheap endless iterator over the prepared inputs
+    state = [0]
+    def nextValue():
+        i = state[0]
+        state[0] = (i+1) %len(values)
+        return values[i]
+    return nextValue
+
+def _scalarMultiplication(curveOf):
+    def setup(seed:int):
+        rng = random.Random(seed)
+        curve,(x,y) = curveOf(rng)
+        bits = curve.p.bit_length()
+        nextScalar = _cycle([rng.getrandbits(bits) | (1<<(bits-1)) for i in range(_INPUT_COUNT)])
+        return lambda: curve.pointMultiplication(x,y,nextScalar())
+    return setup
+
+def _named(name:str):
+    def curveOf(rng:random.Random):
+        curve = namedCurve(name)
+        return curve,curve.generator.toTuple()
+    return curveOf
+
+def _pointAddition(seed:int):
+    rng = random.Random(seed)
+    curve = namedCurve("secp256r1")
+    nextPair = _cycle([(_randomPoint(curve,rng),_randomPoint(curve,rng)) for i in range(_INPUT_COUNT)])
+    def run():
+        (xp,yp),(xq,yq) = nextPair()
+        return curve.pointAddition(xp,yp,xq,yq)
+    return run
+
+def _sqrt(p:int):
+    def setup(seed:int):
+        rng = random.Random(seed)
+        nextSquare = _cycle([pow(rng.randrange(1,p),2,p) for i in range(_INPUT_COUNT)])
+        return lambda: sqrtModPrime(p,nextSquare())
+    return setup
+
+def _decompression(curveOf):
+    def setup(seed:int):
+        rng = random.Random(seed)
+        curve,point = curveOf(rng)
+        nextPoint = _cycle([curve.pointCompression(*_randomPoint(curve,rng)) for i in range(_INPUT_COUNT)])
+        return lambda: curve.pointDecompression(*nextPoint())
+    return setup
+
+def _decodeBatch(seed:int):
+    rng = random.Random(seed)
+    curve,point = _randomCurve((1<<40)-87,rng)
+    data = curve.encodePoints([_randomPoint(curve,rng) for i in range(_DECODE_BATCH)])
+    return lambda: curve.decodePoints(data,asArray=True)
+
+def _enumeration(p:int):
+    def setup(seed:int):
+        rng = random.Random(seed)
+        a,b = rng.randrange(p),rng.randrange(p)
+        # a fresh curve each call, so the curve's cache does not answer from an earlier run
+        return lambda: FiniteFieldEllipticCurve(a,b,p,checkPrime=False).generatePoints()
+    return setup
+
+def _importTime(seed:int):
+    from .importTime import measureImport
+    return lambda repeat: [ms/1000 for ms in measureImport(repeat)["runsMs"]]
+
+def benchmarkCases() -> list[BenchmarkCase]:
+    """Return every benchmark case, in the order they are run"""
+    cases = [
+        BenchmarkCase("scalarMult/32",_scalarMultiplication(lambda rng: _randomCurve(_PRIME_32,rng)),number=200),
+        BenchmarkCase("scalarMult/128",_scalarMultiplication(lambda rng: _randomCurve(_PRIME_128,rng)),number=40),
+        BenchmarkCase("scalarMult/256-secp256r1",_scalarMultiplication(_named("secp256r1")),number=20),
+        BenchmarkCase("scalarMult/256-secp256k1",_scalarMultiplication(_named("secp256k1")),number=20),
+        BenchmarkCase("scalarMult/521",_scalarMultiplication(lambda rng: _randomCurve(_PRIME_521,rng)),number=5),
+        BenchmarkCase("pointAddition/256",_pointAddition,number=2000),
+        BenchmarkCase("sqrt/256-p3mod4",_sqrt(namedCurve("secp256r1").p),number=500),
+        BenchmarkCase("sqrt/224-tonelliShanks",_sqrt(_PRIME_224),number=100),
+        BenchmarkCase("decompress/32",_decompression(lambda rng: _randomCurve(_PRIME_32,rng)),number=2000),
+        BenchmarkCase("decompress/256",_decompression(_named("secp256r1")),number=500),
+        BenchmarkCase("decodePoints/40",_decodeBatch,number=5,opsPerCall=_DECODE_BATCH,unit="point"),
+    ]
+    for p in _ENUMERATION_PRIMES:
+        cases.append(BenchmarkCase("enumerate/"+str(p),_enumeration(p),number=max(1,100000//p),unit="curve"))
+    cases.append(BenchmarkCase("import/package",_importTime,unit="import",external=True))
+    return cases
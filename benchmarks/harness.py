@@ -0,0 +1,142 @@
+import json
+import platform
+import re
+import sys
+import time
+
+_PERCENTILES = (50,90,99)
+
+
+def percentile(values:list[float], q:float) -> float:
+    """
+    Return the q-th percentile of values, interpolating linearly between the closest ranks.
+
+        Parameters:
+                values : The samples, in any order
+                q : The percentile, between 0 and 100
+    """
+    assert len(values) > 0,"need at least one value"
+    ordered = sorted(values)
+    rank = (len(ordered)-1)*q/100
+    low = int(rank)
+    high = min(low+1,len(ordered)-1)
+    return ordered[low] + (ordered[high]-ordered[low])*(rank-low)
+
+def summarize(secondsPerOp:list[float]) -> dict:
+    """
+    Return the metrics of a list of per operation timings in seconds:\n
+    opsPerSec from the median, p50Us, p90Us and p99Us in microseconds, minUs, meanUs and the number of samples.
+    """
+    result = {"opsPerSec": 1/percentile(secondsPerOp,50)}
+    for q in _PERCENTILES:
+        result["p"+str(q)+"Us"] = 1e6*percentile(secondsPerOp,q)
+    result["minUs"] = 1e6*min(secondsPerOp)
+    result["meanUs"] = 1e6*sum(secondsPerOp)/len(secondsPerOp)
+    result["samples"] = len(secondsPerOp)
+    return result
+
+def measure(fn, number:int, repeat:int, warmup:int = 1) -> list[float]:
+    """
+    Return the time per call of fn in seconds for each of repeat samples of number calls.
+
+        Parameters:
+                fn : The function to time, called without arguments
+                number : The number of calls per sample
+                repeat : The number of samples
+                warmup : The number of samples run first and thrown away, so caches and lazy imports are warm
+    """
+    timer = time.perf_counter
+    samples = []
+    for i in range(warmup+repeat):
+        start = timer()
+        for j in range(number):
+            fn()
+        elapsed = timer()-start
+        if (i >= warmup):
+            samples.append(elapsed/number)
+    return samples
+
+def environment() -> dict:
+    """Return what the results depend on besides the code: the Python version, the platform and the field backend"""
+    import FieldBackends
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "backend": FieldBackends.getBackend().name,
+            "backends": FieldBackends.availableBackends()}
+
+def runBenchmarks(cases:list, repeat:int = 15, pattern:str | None = None, seed:int = 0, progress=None) -> dict:
+    """
+    Return a report of every case whose name matches pattern, ready to be written as JSON.
+
+        Parameters:
+                cases : The BenchmarkCase objects to run, see cases.benchmarkCases
+                repeat : The number of timed samples per case
+                pattern : A regular expression matched against the case names, all cases by default
+                seed : The seed every case derives its inputs from, so runs with the same seed do the same work
+                progress : Called with the name and metrics of every case once it is done
+
+        Details:
+                Each sample times BenchmarkCase.number calls, and the time per operation is the sample time divided by\n
+                the calls and by BenchmarkCase.opsPerCall. Cases marked external time themselves, such as the import time.
+    """
+    results = {}
+    for case in cases:
+        if (pattern != None and not re.search(pattern,case.name)):
+            continue
+        if (case.external):
+            secondsPerOp = case.setup(seed)(repeat)
+        else:
+            fn = case.setup(seed)
+            secondsPerOp = [t/case.opsPerCall for t in measure(fn,case.number,repeat)]
+        metrics = summarize(secondsPerOp)
+        metrics["unit"] = case.unit
+        results[case.name] = metrics
+        if (progress != None):
+            progress(case.name,metrics)
+    return {"version": 1,
+            "seed": seed,
+            "repeat": repeat,
+            "environment": environment(),
+            "results": results}
+
+def compareResults(baseline:dict, current:dict, threshold:float = 0.15) -> list[dict]:
+    """
+    Return one row per case found in both reports, with the relative change of opsPerSec and whether it regressed.
+
+        Parameters:
+                baseline : The stored report to compare against
+                current : The new report
+                threshold : The largest tolerated relative drop of opsPerSec, 0.15 means 15% slower fails
+
+        Details:
+                A case regresses when current opsPerSec < (1 - threshold) * baseline opsPerSec.\n
+                Cases missing from either report are listed with a change of None and never regress.
+    """
+    rows = []
+    names = list(baseline["results"]) + [name for name in current["results"] if name not in baseline["results"]]
+    for name in names:
+        old = baseline["results"].get(name)
+        new = current["results"].get(name)
+        if (old == None or new == None):
+            rows.append({"name": name, "baseline": old and old["opsPerSec"], "current": new and new["opsPerSec"], "change": None, "regressed": False})
+            continue
+        change = new["opsPerSec"]/old["opsPerSec"] - 1
+        rows.append({"name": name, "baseline": old["opsPerSec"], "current": new["opsPerSec"], "change": change,
+                     "regressed": new["opsPerSec"] < (1-threshold)*old["opsPerSec"]})
+    return rows
+
+def loadReport(path:str) -> dict:
+    """Return a report written by writeReport"""
+    with open(path) as f:
+        return json.load(f)
+
+def writeReport(report:dict, path:str | None = None):
+    """Write a report as JSON to path, or to standard output if path is None"""
+    text = json.dumps(report,indent=2,sort_keys=True)
+    if (path == None):
+        sys.stdout.write(text+"\n")
+        return
+    with open(path,"w") as f:
+        f.write(text+"\n")
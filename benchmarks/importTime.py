@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_HEAVY_MODULES = ("numpy","scipy","matplotlib","sympy","gmpy2","multiprocessing")
+_DEFAULT_MAX_MS = 100.0
+
+_CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+path = {init!r}
+with open(path) as f:
+    exec(compile(f.read(), path, "exec"), {{"__name__": "GideonHaydenECC"}})
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"ms": 1000*elapsed, "rssKb": after-before, "heavy": heavy}}))
+"""
+
+
+def measureImport(repeat:int = 5) -> dict:
+    """
+    Return the import time of the package, measured in repeat fresh interpreters.
+
+        Parameters:
+                repeat : The number of interpreters to start
+
+        Details:
+                Each child times executing the package __init__ (so interpreter start up is not counted) and reports\n
+                the growth of its peak RSS and which of the heavy optional modules ended up loaded.\n
+                The result has the median and max time in ms, the time of every run, the median RSS growth in kB\n
+                and the heavy modules seen.
+    """
+    code = _CHILD.format(root=_ROOT,init=os.path.join(_ROOT,"__init__.py"),heavy=_HEAVY_MODULES)
+    runs = []
+    for i in range(repeat):
+        out = subprocess.run([sys.executable,"-c",code],capture_output=True,text=True,check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"medianMs": statistics.median(r["ms"] for r in runs),
+            "maxMs": max(r["ms"] for r in runs),
+            "runsMs": [r["ms"] for r in runs],
+            "rssKb": statistics.median(r["rssKb"] for r in runs),
+            "heavyModules": sorted({name for r in runs for name in r["heavy"]})}
+
+def main(argv:list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that importing the package stays cheap.")
+    parser.add_argument("--repeat",type=int,default=5,help="number of fresh interpreters to time")
+    parser.add_argument("--max-ms",type=float,default=_DEFAULT_MAX_MS,help="fail if the median import time exceeds this")
+    args = parser.parse_args(argv)
+    result = measureImport(args.repeat)
+    print(json.dumps(result,indent=2))
+    failed = False
+    if (result["heavyModules"]):
+        print("FAIL: importing the package loaded "+", ".join(result["heavyModules"]),file=sys.stderr)
+        failed = True
+    if (result["medianMs"] > args.max_ms):
+        print("FAIL: median import time %.1f ms exceeds %.1f ms" % (result["medianMs"],args.max_ms),file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,9 +12,8 @@ setup(
         author="Gideon Hayden",
         description=DESCRIPTION,
         long_description=LONG_DESCRIPTION,
-        packages=find_packages(),
+        packages=find_packages(exclude=["benchmarks","benchmarks.*"]),
         install_requires=['numpy',
-                          'scipy',
                           'matplotlib',
                           'sympy'], # add any additional packages that 
         # needs to be installed along with your package. Eg: 'caer'
@@ -0,0 +1,84 @@
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if (_ROOT not in sys.path):
+    sys.path.insert(0,_ROOT)
+
+from ECDSA import ECDSA
+from FFEllipticCurves import FiniteFieldEllipticCurve
+from NamedCurves import namedCurve, _CURVE_PARAMETERS
+
+# RFC 6979 A.2.5, P-256 with SHA-256
+_RFC6979_KEY = 0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721
+_RFC6979_PUBLIC = (0x60FED4BA255A9D31C961EB74C6356D68C049B8923B61FA6CE669622E60F29FB6,
+                   0x7903FE1008B8BC99A41AE9E95628BC64F2F1B20C2D7E9F5177A3C294D4462299)
+_RFC6979_VECTORS = [
+    (b"sample",
+     0xA6E3C57DD01ABE90086538398355DD4C3B17AA873382B0F24D6129493D8AAD60,
+     0xEFD48B2AACB6A8FD1140DD9CD45E81D69D2C877B56AAF991C34D0EA84EAF3716,
+     0xF7CB1C942D657C41D436C7A1B6E29F65F3E900DBB9AFF4064DC4AB2F843ACDA8),
+    (b"test",
+     0xD16B6AE827F17175E040871A1C7EC3500192C4C92677336EC2537ACAEE0008E0,
+     0xF1ABB023518351CD71D881567B1EA663ED3EFCF6C5132B354F28D3B0B7D38367,
+     0x019F4113742A2B14BD25926B49C649155F267E60D3814B4C0CC84250E46F0083),
+]
+
+
+def _rawCurve(name:str) -> tuple[FiniteFieldEllipticCurve,int,int,int]:
+    # the same domain parameters as the named curve, but without its cached number of points
+    p,a,b,gx,gy,n,h = _CURVE_PARAMETERS[name]
+    return FiniteFieldEllipticCurve(a,b,p,checkPrime=False),gx,gy,n
+
+def test_rfc6979PublicKey():
+    ecdsa = ECDSA(namedCurve("secp256r1"))
+    assert ecdsa.publicKey(_RFC6979_KEY) == _RFC6979_PUBLIC
+
+def test_rfc6979Signatures():
+    ecdsa = ECDSA(namedCurve("secp256r1"))
+    for message,k,r,s in _RFC6979_VECTORS:
+        assert next(ecdsa._nonces(_RFC6979_KEY,message)) == k
+        signature = ecdsa.sign(message,_RFC6979_KEY)
+        # sign returns the low or high s, whichever makes the y of R even
+        assert signature in ((r,s),(r,ecdsa.n-s))
+        assert ecdsa.verify(message,signature,_RFC6979_PUBLIC)
+        assert ecdsa.verify(message,(r,s),_RFC6979_PUBLIC)
+
+def test_cofactorFromRawParameters():
+    for name in ("secp256k1","secp256r1"):
+        curve,gx,gy,n = _rawCurve(name)
+        ecdsa = ECDSA(curve,gx,gy,n)
+        assert ecdsa.h == 1
+        assert curve._cachedCardinality() == None
+
+def test_verifyBatchWithForgery():
+    curve,gx,gy,n = _rawCurve("secp256k1")
+    ecdsa = ECDSA(curve,gx,gy,n)
+    messages = [("message "+str(i)).encode() for i in range(12)]
+    keys = [ecdsa.publicKey(1000+i) for i in range(12)]
+    signatures = [ecdsa.sign(m,1000+i) for i,m in enumerate(messages)]
+    assert ecdsa.verifyBatch(messages,signatures,keys) == [True]*12
+    r,s = signatures[7]
+    signatures[7] = (r,(s+1) %n)
+    expected = [True]*12
+    expected[7] = False
+    assert ecdsa.verifyBatch(messages,signatures,keys) == expected
+    assert ecdsa.verifyBatch(messages,signatures,keys) == [ecdsa.verify(m,sig,Q) for m,sig,Q in zip(messages,signatures,keys)]
+
+def test_rejectsKeyOutsideSubgroup():
+    # y^2 = x^3 + 2x + 1 over F_1009 has 1060 = 20*53 points, (72,135) has order 53 and (0,1) order 530
+    curve = FiniteFieldEllipticCurve(2,1,1009)
+    ecdsa = ECDSA(curve,72,135)
+    assert (ecdsa.n,ecdsa.h) == (53,20)
+    T = curve.pointMultiplication(0,1,265)
+    d = 5
+    Q = ecdsa.publicKey(d)
+    outside = curve.pointAddition(*Q,*T)
+    for i in range(100):
+        message = str(i).encode()
+        r,s = ecdsa.sign(message,d)
+        if ((r*pow(s,-1,ecdsa.n)) %ecdsa.n %2 == 0):
+            break
+    # u2 is even, so u1*G + u2*(Q+T) = u1*G + u2*Q and only the subgroup check tells the keys apart
+    assert ecdsa.verify(message,(r,s),Q)
+    assert not ecdsa.verify(message,(r,s),outside)